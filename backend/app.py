@@ -75,9 +75,13 @@ def executar_scraping():
                         todos_produtos.append(produto_normalizado)
         
         # Processar imagens com OCR (encartes em PDF/imagem)
-        for mercado in ['guanabara', 'mundial', 'supermarket', 'prezunic']:
-            produtos_ocr = ocr.processar_imagens_mercado(mercado.title())
-            todos_produtos.extend(produtos_ocr)
+        try:
+            for mercado in ['guanabara', 'mundial', 'supermarket', 'prezunic']:
+                produtos_ocr = ocr.processar_imagens_mercado(mercado.title())
+                todos_produtos.extend(produtos_ocr)
+        finally:
+            # Não manter os processos de OCR ociosos em memória entre requisições
+            ocr.fechar()
         
         # Salvar em CSV
         if todos_produtos:
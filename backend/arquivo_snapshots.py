@@ -0,0 +1,168 @@
+"""
+Arquivo de snapshots das páginas baixadas pelo scraper
+Cada página (HTML ou árvore reduzida do navegador) é gravada comprimida com
+gzip e endereçada pelo SHA-256 do conteúdo: a mesma página em várias execuções
+ocupa um único objeto. O índice (JSON Lines) registra mercado, categoria, URL,
+tipo e horário de cada captura, para reextrair offline com
+MercadoScraper.reextrair_snapshots. podar descarta capturas mais antigas que
+SCRAPING_CONFIG['dias_snapshots'] e, acima de SCRAPING_CONFIG['snapshots_max_mb'],
+as mais antigas até caber (objetos sem captura no índice são apagados)
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from config import DATA_DIR, SCRAPING_CONFIG
+
+HTML = 'html'
+ARVORE = 'arvore'  # JSON de parser_html.JS_ARVORE_PRODUTOS
+JSON = 'json'  # respostas JSON da grade de produtos: [{'url', 'dados'}]
+
+
+class ArquivoSnapshots:
+    def __init__(self, diretorio=None):
+        self.diretorio = diretorio or os.path.join(DATA_DIR, 'snapshots')
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.caminho_indice = os.path.join(self.diretorio, 'indice.jsonl')
+        self._lock = threading.Lock()
+
+    def _caminho_objeto(self, sha256):
+        return os.path.join(self.diretorio, 'objetos', sha256[:2], f"{sha256}.gz")
+
+    def guardar(self, mercado, categoria, url, conteudo, tipo=HTML):
+        """Grava a página (se o conteúdo ainda não está no arquivo) e registra a captura no índice"""
+        dados = conteudo.encode('utf-8')
+        sha256 = hashlib.sha256(dados).hexdigest()
+        caminho = self._caminho_objeto(sha256)
+        if not os.path.exists(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            temporario = f"{caminho}.{threading.get_ident()}.tmp"
+            with gzip.open(temporario, 'wb', compresslevel=6) as f:
+                f.write(dados)
+            os.replace(temporario, caminho)
+
+        entrada = {
+            'mercado': mercado,
+            'categoria': categoria,
+            'url': url,
+            'tipo': tipo,
+            'sha256': sha256,
+            'tamanho': len(dados),
+            'capturado_em': datetime.now().isoformat(timespec='seconds')
+        }
+        with self._lock:
+            with open(self.caminho_indice, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+        return entrada
+
+    def _ler_indice(self):
+        try:
+            with open(self.caminho_indice, 'r', encoding='utf-8') as f:
+                linhas = f.readlines()
+        except OSError:
+            return []
+        entradas = []
+        for linha in linhas:
+            try:
+                entradas.append(json.loads(linha))
+            except ValueError:
+                continue  # linha truncada por uma execução interrompida
+        return entradas
+
+    def listar(self, mercado=None, categoria=None, desde=None, ate=None):
+        """Capturas do índice, em ordem cronológica, filtradas por mercado, categoria e período (datetime)"""
+        entradas = []
+        for entrada in self._ler_indice():
+            try:
+                capturado_em = datetime.fromisoformat(entrada['capturado_em'])
+            except (KeyError, ValueError):
+                continue
+            if mercado and entrada.get('mercado') != mercado:
+                continue
+            if categoria and entrada.get('categoria') != categoria:
+                continue
+            if (desde and capturado_em < desde) or (ate and capturado_em > ate):
+                continue
+            entradas.append(entrada)
+        return entradas
+
+    def ultimos(self, tipo=None, **filtros):
+        """Captura mais recente de cada URL"""
+        por_url = {}
+        for entrada in self.listar(**filtros):
+            if tipo is None or entrada.get('tipo') == tipo:
+                por_url[entrada.get('url')] = entrada
+        return list(por_url.values())
+
+    def ler(self, entrada):
+        """Conteúdo (str) de uma captura do índice"""
+        with gzip.open(self._caminho_objeto(entrada['sha256']), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def podar(self, dias=None, max_mb=None):
+        """
+        Remove do índice as capturas com mais de `dias` e, se os objetos passam de
+        `max_mb`, as mais antigas até caber; apaga os objetos que ficaram sem captura.
+        Retorna o número de capturas removidas
+        """
+        if dias is None:
+            dias = SCRAPING_CONFIG.get('dias_snapshots', 30)
+        if max_mb is None:
+            max_mb = SCRAPING_CONFIG.get('snapshots_max_mb', 1000)
+        with self._lock:
+            entradas = []
+            for entrada in self._ler_indice():
+                try:
+                    entradas.append((datetime.fromisoformat(entrada['capturado_em']), entrada))
+                except (KeyError, ValueError):
+                    continue
+            entradas.sort(key=lambda item: item[0])
+            total = len(entradas)
+
+            limite_data = datetime.now() - timedelta(days=dias)
+            entradas = [(quando, entrada) for quando, entrada in entradas if quando >= limite_data]
+
+            # Tamanho em disco (comprimido) de cada objeto referenciado
+            tamanhos = {}
+            for _, entrada in entradas:
+                sha256 = entrada['sha256']
+                if sha256 not in tamanhos:
+                    try:
+                        tamanhos[sha256] = os.path.getsize(self._caminho_objeto(sha256))
+                    except OSError:
+                        tamanhos[sha256] = 0
+            referencias = {}
+            for _, entrada in entradas:
+                referencias[entrada['sha256']] = referencias.get(entrada['sha256'], 0) + 1
+            ocupado = sum(tamanhos.values())
+            limite_bytes = max_mb * 1024 * 1024
+            inicio = 0
+            while ocupado > limite_bytes and inicio < len(entradas):
+                sha256 = entradas[inicio][1]['sha256']
+                referencias[sha256] -= 1
+                if referencias[sha256] == 0:
+                    ocupado -= tamanhos[sha256]
+                inicio += 1
+            entradas = entradas[inicio:]
+
+            removidas = total - len(entradas)
+            if removidas:
+                temporario = f"{self.caminho_indice}.{threading.get_ident()}.tmp"
+                with open(temporario, 'w', encoding='utf-8') as f:
+                    for _, entrada in entradas:
+                        f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+                os.replace(temporario, self.caminho_indice)
+
+            # Objetos sem nenhuma captura no índice
+            vivos = {entrada['sha256'] for _, entrada in entradas}
+            dir_objetos = os.path.join(self.diretorio, 'objetos')
+            for raiz, _, arquivos in os.walk(dir_objetos):
+                for arquivo in arquivos:
+                    if arquivo.endswith('.gz') and arquivo[:-len('.gz')] not in vivos:
+                        try:
+                            os.remove(os.path.join(raiz, arquivo))
+                        except OSError:
+                            pass
+        return removidas
@@ -0,0 +1,100 @@
+"""
+Cache em disco com índice JSON e despejo LRU por tamanho total
+Base comum dos caches do backend (downloads HTTP, resultados de OCR...)
+"""
+import json
+import os
+import threading
+import time
+
+
+class CacheDisco:
+    def __init__(self, diretorio, max_bytes):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.caminho_indice = os.path.join(self.diretorio, 'indice.json')
+        self._lock = threading.RLock()
+        self._indice = self._carregar()
+
+    def _carregar(self):
+        try:
+            with open(self.caminho_indice, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def salvar(self):
+        """Grava o índice de forma atômica"""
+        with self._lock:
+            temporario = self.caminho_indice + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(self._indice, f, ensure_ascii=False)
+            os.replace(temporario, self.caminho_indice)
+
+    def caminho(self, arquivo):
+        return os.path.join(self.diretorio, arquivo)
+
+    def obter(self, chave):
+        """Entrada da chave (atualizando o último acesso), ou None se ausente"""
+        with self._lock:
+            entrada = self._indice.get(chave)
+            if not entrada:
+                return None
+            if not os.path.exists(self.caminho(entrada['arquivo'])):
+                # Arquivo apagado por fora do cache
+                del self._indice[chave]
+                return None
+            entrada['acessado_em'] = time.time()
+            return dict(entrada)
+
+    def gravar(self, chave, arquivo, **metadados):
+        """Registra um arquivo já escrito em self.caminho(arquivo) e aplica o despejo"""
+        with self._lock:
+            entrada = dict(metadados)
+            entrada['arquivo'] = arquivo
+            entrada['tamanho'] = os.path.getsize(self.caminho(arquivo))
+            entrada['acessado_em'] = time.time()
+            self._indice[chave] = entrada
+            self._despejar(preservar=chave)
+            self.salvar()
+            return dict(entrada)
+
+    def remover(self, chave):
+        with self._lock:
+            entrada = self._indice.pop(chave, None)
+            if entrada:
+                self._apagar_arquivo(entrada['arquivo'])
+                self.salvar()
+
+    def chaves(self):
+        with self._lock:
+            return list(self._indice.keys())
+
+    def tamanho_total(self):
+        with self._lock:
+            return sum(e.get('tamanho', 0) for e in self._indice.values())
+
+    def _apagar_arquivo(self, arquivo):
+        # Vários registros podem apontar para o mesmo arquivo
+        if any(e['arquivo'] == arquivo for e in self._indice.values()):
+            return
+        try:
+            os.remove(self.caminho(arquivo))
+        except OSError:
+            pass
+
+    def _despejar(self, preservar=None):
+        """Remove as entradas menos usadas até o total caber em max_bytes"""
+        total = self.tamanho_total()
+        if total <= self.max_bytes:
+            return
+        candidatas = sorted(
+            (e['acessado_em'], chave) for chave, e in self._indice.items() if chave != preservar
+        )
+        for _, chave in candidatas:
+            if total <= self.max_bytes:
+                break
+            entrada = self._indice.pop(chave)
+            total -= entrada.get('tamanho', 0)
+            self._apagar_arquivo(entrada['arquivo'])
@@ -0,0 +1,60 @@
+"""
+Cache HTTP em disco para encartes (PDFs e imagens)
+Guarda ETag/Last-Modified por URL, envia requisições condicionais e devolve o
+arquivo em cache quando o servidor responde 304 Not Modified
+"""
+import hashlib
+import os
+from collections import namedtuple
+from config import CACHE_DIR, SCRAPING_CONFIG
+from cache_disco import CacheDisco
+from downloader import baixar_stream
+
+# caminho: arquivo em cache; mudou: conteúdo diferente da última versão baixada
+ResultadoDownload = namedtuple('ResultadoDownload', ['caminho', 'mudou', 'sha256'])
+
+
+class CacheHTTP:
+    def __init__(self, session, diretorio=None, max_bytes=None):
+        # requests.Session ou função que devolve a Session da thread atual
+        self.session = session
+        if max_bytes is None:
+            max_bytes = SCRAPING_CONFIG.get('cache_http_max_mb', 500) * 1024 * 1024
+        self.cache = CacheDisco(diretorio or os.path.join(CACHE_DIR, 'http'), max_bytes)
+
+    def _nome_arquivo(self, url):
+        extensao = os.path.splitext(url.split('?', 1)[0])[1][:8]
+        return hashlib.sha1(url.encode('utf-8')).hexdigest() + extensao
+
+    def baixar(self, url):
+        """Baixa a URL usando o cache; retorna ResultadoDownload"""
+        entrada = self.cache.obter(url)
+        headers = {}
+        if entrada:
+            if entrada.get('etag'):
+                headers['If-None-Match'] = entrada['etag']
+            if entrada.get('last_modified'):
+                headers['If-Modified-Since'] = entrada['last_modified']
+
+        # Streaming direto para o arquivo do cache (hash calculado durante o download)
+        arquivo = self._nome_arquivo(url)
+        session = self.session() if callable(self.session) else self.session
+        resultado = baixar_stream(session, url, self.cache.caminho(arquivo), headers=headers)
+        response = resultado.response
+        if resultado.caminho is None and entrada:
+            print(f"Cache HTTP: {url} não modificado (304)")
+            return ResultadoDownload(self.cache.caminho(entrada['arquivo']), False, entrada.get('sha256'))
+        if resultado.caminho is None:
+            raise ValueError(f"Resposta 304 sem entrada no cache para {url}")
+        caminho = resultado.caminho
+        sha256 = resultado.sha256
+
+        # Servidores sem suporte a requisição condicional: comparar pelo conteúdo
+        mudou = not entrada or entrada.get('sha256') != sha256
+        self.cache.gravar(
+            url, arquivo,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            sha256=sha256
+        )
+        return ResultadoDownload(caminho, mudou, sha256)
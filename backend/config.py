@@ -42,13 +42,131 @@ MERCADOS = {
 SCRAPING_CONFIG = {
     'timeout': 30,
     'retry_attempts': 3,
-    'delay_between_requests': 2
+    'delay_between_requests': 2,
+    # Execução concorrente dos mercados em scrape_all (um navegador por worker)
+    'mercados_em_paralelo': True,
+    'max_workers_mercados': 4,
+    # Pool de drivers Chrome: limite de instâncias e páginas antes de reciclar
+    'max_drivers': 4,
+    'max_paginas_por_driver': 20,
+    # Categorias de um mercado visitadas em paralelo (drivers do pool); o
+    # intervalo entre páginas do mesmo host é 'delay_between_requests'
+    'max_workers_categorias': 3,
+    # Caminho rápido: GET simples antes do navegador. Se o HTML estático trouxer
+    # menos produtos que o mínimo, a URL passa a usar o navegador (decisão
+    # lembrada por URL e reavaliada após alguns dias)
+    'busca_estatica': True,
+    'min_produtos_estatico': 5,
+    'reavaliar_modo_dias': 7,
+    # Backend de parse HTML da extração: 'html.parser', 'lxml' ou 'selectolax'
+    # (sem o pacote instalado, cai para 'html.parser')
+    'parser_html': 'lxml',
+    # Produtos lidos das respostas JSON (XHR/fetch) capturadas pelo log de
+    # performance do Chrome; com menos que o mínimo, a extração usa o HTML
+    'capturar_json': True,
+    'min_produtos_json': 5,
+    # Extração sobre uma árvore reduzida montada no navegador (só elementos de
+    # produto e texto), em vez de transferir e parsear o page_source inteiro
+    'extracao_no_navegador': True,
+    # Scraping incremental: página cujos blocos preço + nome (PRECO_NOME_GUANABARA /
+    # PRECO_NOME_SIMPLES sobre o texto visível) têm o mesmo hash que na última
+    # execução, pelo mesmo caminho de busca, reaproveita os produtos já extraídos.
+    # A página ainda é baixada e parseada; só as estratégias de extração são puladas.
+    # Mudanças fora desses blocos (que só as outras estratégias pegariam) não
+    # invalidam a impressão até a reextração forçada após 'impressoes_max_dias' dias
+    'scraping_incremental': True,
+    'impressoes_max_dias': 7,
+    # Toda página baixada vai para data/snapshots (gzip, deduplicada por conteúdo)
+    'arquivar_snapshots': True,
+    # Retenção do arquivo: capturas com mais de 'dias_snapshots' dias saem a cada
+    # scrape_all e, acima de 'snapshots_max_mb' MB comprimidos, as mais antigas
+    'dias_snapshots': 30,
+    'snapshots_max_mb': 1000,
+    # Perfil "enxuto" nas páginas de categoria (só o texto do DOM interessa):
+    # o Chrome não baixa imagens, mídia, fontes nem anúncios/rastreadores.
+    # Páginas de encarte (screenshot) carregam tudo
+    'perfil_enxuto': True,
+    'bloquear_urls': [
+        # Imagens e mídia
+        # (o '*' final cobre query strings: foto.jpg?v=2)
+        '*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*',
+        '*.mp4*', '*.webm*', '*.mp3*',
+        # Fontes
+        '*.woff*', '*.ttf*', '*.otf*', '*.eot*',
+        # Anúncios, analytics e chats de terceiros
+        '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*',
+        '*googlesyndication.com*', '*googleadservices.com*', '*facebook.net*',
+        '*connect.facebook.*', '*hotjar.com*', '*clarity.ms*', '*tiktok.com*',
+        '*criteo.*', '*taboola.com*', '*outbrain.com*', '*zendesk.com*', '*jivosite.com*'
+    ],
+    # Tamanho máximo do cache HTTP de encartes (despejo LRU)
+    'cache_http_max_mb': 500,
+    # Downloads em streaming: limite por arquivo e tamanho de cada bloco
+    'download_max_mb': 200,
+    'download_bloco_kb': 256,
+    # Tetos (segundos) das esperas por prontidão; cada espera retorna assim que
+    # a página está pronta. Chaves por mercado sobrescrevem 'padrao'.
+    'esperas': {
+        'padrao': {
+            'carregamento': 15,       # documento completo + rede ociosa após abrir a página
+            'produtos_estaveis': 10,  # contagem de preços na página parar de mudar
+            'scroll': 3,              # por rolagem, aguardando o scrollHeight crescer
+            'max_scrolls': 5,
+            'janela_estavel': 1.0,    # tempo sem mudança para considerar estável
+            'janela_rede': 0.5,       # tempo sem recursos terminando para considerar ociosa
+            'intervalo': 0.25         # intervalo entre verificações
+        },
+        'guanabara': {
+            'carregamento': 20,
+            'produtos_estaveis': 12
+        }
+    }
 }
 
 # Configurações de OCR
 OCR_CONFIG = {
     'lang': 'por',
-    'psm': 6  # Assume uniform block of text
+    'psm': 6,  # Assume uniform block of text
+    # PDFs vetoriais: usar a camada de texto e só rasterizar + OCR as páginas
+    # com menos de 'pdf_min_caracteres' caracteres alfanuméricos utilizáveis
+    'usar_texto_pdf': True,
+    'pdf_min_caracteres': 50,
+    # Rasterização página a página: DPI padrão, DPI por mercado e processos
+    'dpi': 300,
+    'dpi_mercados': {},  # ex.: {'mundial': 200}
+    'workers_rasterizacao': 2,
+    # False: o scraper só baixa o PDF e o OCR renderiza cada página sob demanda
+    'rasterizar_no_download': True,
+    # OCR de várias imagens em processos paralelos (None = um por núcleo) e
+    # threads internas de cada Tesseract (OMP_THREAD_LIMIT, definido ao criar o
+    # primeiro motor, antes de carregar o tesserocr; evita disputar os núcleos)
+    'workers_ocr': None,
+    'threads_tesseract': 1,
+    # PSMs adaptativos: uma passada por vez, na ordem aprendida por mercado, parando
+    # quando a leitura atinge 'limiar_psm' (metade confiança média, metade preços
+    # por linha relativos a 'densidade_precos_alvo'); False = todos os PSMs sempre
+    'psm_adaptativo': True,
+    'psms': [6, 11, 3],
+    'limiar_psm': 0.6,
+    'densidade_precos_alvo': 0.2,
+    # A primeira e a cada 'exploracao_psm' imagens de um mercado rodam todos os PSMs
+    # para comparar (0 = nunca; a ordem aprendida só reforçaria o primeiro PSM)
+    'exploracao_psm': 10,
+    # Limite em disco das leituras OCR guardadas (texto + caixas das palavras);
+    # acima dele as usadas há mais tempo são descartadas
+    'cache_ocr_max_mb': 500,
+    # Motor de OCR: 'tesserocr' (Tesseract no próprio processo, modelo carregado
+    # uma vez por worker) ou 'pytesseract' (um processo tesseract por chamada);
+    # sem tesserocr instalado usa pytesseract. 'tessdata': pasta dos traineddata (opcional)
+    'motor_ocr': 'tesserocr',
+    'tessdata': None,
+    # Páginas com lado maior que 'ladrilho_max_lado' px passam pelo OCR em ladrilhos
+    # cortados nas calhas em branco, com 'ladrilho_sobreposicao' px de sobreposição,
+    # em 'workers_ladrilhos' threads (None = núcleos / threads_tesseract; 1 dentro dos workers de OCR)
+    'ocr_em_ladrilhos': True,
+    'ladrilho_max_lado': 1800,
+    'ladrilho_sobreposicao': 40,
+    'workers_ladrilhos': None
 }
 
 # Diretórios
@@ -56,11 +174,13 @@ DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 IMAGES_DIR = os.path.join(DATA_DIR, 'images')
 CSV_DIR = os.path.join(DATA_DIR, 'csv')
 EXCEL_DIR = os.path.join(DATA_DIR, 'excel')
+CACHE_DIR = os.path.join(DATA_DIR, 'cache')
 
 # Criar diretórios se não existirem
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(IMAGES_DIR, exist_ok=True)
 os.makedirs(CSV_DIR, exist_ok=True)
 os.makedirs(EXCEL_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
 
 
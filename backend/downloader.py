@@ -0,0 +1,149 @@
+"""
+Download em streaming para disco
+Escreve a resposta em blocos, calcula o SHA-256 incrementalmente, limita o
+tamanho máximo e retoma downloads interrompidos com requisições Range, de
+modo que o pico de memória não depende do tamanho do encarte. O validador
+(ETag / Last-Modified) da resposta fica ao lado do .part e vai no If-Range da
+retomada: se o arquivo remoto mudou, o servidor manda o arquivo inteiro
+"""
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from config import SCRAPING_CONFIG
+
+ResultadoStream = namedtuple('ResultadoStream', ['response', 'caminho', 'sha256', 'tamanho'])
+
+CONTENT_RANGE = re.compile(r'bytes\s+(\d+)-\d+/(?:\d+|\*)', re.IGNORECASE)
+
+
+class DownloadMuitoGrande(Exception):
+    pass
+
+
+def _hash_parcial(caminho, h, tamanho_bloco):
+    """Atualiza o hash com o conteúdo já baixado de um .part anterior"""
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+
+
+def _validador(response):
+    """Validador aceito em If-Range: ETag forte ou Last-Modified (None se não houver)"""
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+
+def _inicio_content_range(response):
+    """Primeiro byte do Content-Range de uma resposta 206 (None se ausente ou inválido)"""
+    m = CONTENT_RANGE.match(response.headers.get('Content-Range', '').strip())
+    return int(m.group(1)) if m else None
+
+
+def _ler_validador(caminho):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f).get('validador')
+    except (OSError, ValueError):
+        return None
+
+
+def _descartar(*caminhos):
+    for caminho in caminhos:
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+
+def baixar_stream(session, url, destino, headers=None, max_bytes=None, tamanho_bloco=None, retomar=True):
+    """
+    Baixa `url` para `destino` em blocos. Um arquivo `destino + '.part'` de uma
+    tentativa anterior é retomado com Range + If-Range quando o servidor suporta
+    (206) e o arquivo remoto não mudou; sem validador guardado, ou com um
+    Content-Range que não começa no fim do .part, recomeça do zero.
+    Retorna ResultadoStream; se o servidor responder 304, caminho é None.
+    """
+    if max_bytes is None:
+        max_bytes = SCRAPING_CONFIG.get('download_max_mb', 200) * 1024 * 1024
+    if tamanho_bloco is None:
+        tamanho_bloco = SCRAPING_CONFIG.get('download_bloco_kb', 256) * 1024
+
+    parcial = destino + '.part'
+    caminho_validador = parcial + '.validador'
+    headers = dict(headers or {})
+    ja_baixado = os.path.getsize(parcial) if retomar and os.path.exists(parcial) else 0
+    validador = _ler_validador(caminho_validador) if ja_baixado else None
+    if ja_baixado and not validador:
+        # Sem validador não há como saber se os bytes do .part são do mesmo arquivo
+        _descartar(parcial, caminho_validador)
+        ja_baixado = 0
+    if ja_baixado:
+        headers['Range'] = f'bytes={ja_baixado}-'
+        headers['If-Range'] = validador
+
+    response = session.get(url, headers=headers, timeout=SCRAPING_CONFIG['timeout'], stream=True)
+    try:
+        if response.status_code == 304:
+            return ResultadoStream(response, None, None, 0)
+        if ja_baixado and response.status_code == 416:
+            # Range inválido (arquivo remoto mudou/encolheu): recomeçar do zero
+            response.close()
+            _descartar(parcial, caminho_validador)
+            headers.pop('Range', None)
+            headers.pop('If-Range', None)
+            return baixar_stream(session, url, destino, headers, max_bytes, tamanho_bloco, retomar=False)
+        response.raise_for_status()
+
+        h = hashlib.sha256()
+        if response.status_code == 206 and not ja_baixado and _inicio_content_range(response) != 0:
+            raise ValueError(f"{url}: resposta parcial (Content-Range "
+                             f"{response.headers.get('Content-Range')!r}) sem Range pedido")
+        if ja_baixado and response.status_code == 206 and (
+                _validador(response) not in (None, validador)
+                or _inicio_content_range(response) != ja_baixado):
+            # Servidor ignorou o If-Range e o validador mudou (o .part é de outra
+            # versão), ou mandou outro trecho que não o seguinte ao .part: do zero
+            response.close()
+            _descartar(parcial, caminho_validador)
+            headers.pop('Range', None)
+            headers.pop('If-Range', None)
+            return baixar_stream(session, url, destino, headers, max_bytes, tamanho_bloco, retomar=False)
+        if ja_baixado and response.status_code == 206:
+            print(f"Retomando download de {url} a partir de {ja_baixado} bytes")
+            _hash_parcial(parcial, h, tamanho_bloco)
+            modo = 'ab'
+            tamanho = ja_baixado
+        else:
+            # Servidor ignorou o Range ou o arquivo mudou (200): reescrever do início
+            modo = 'wb'
+            tamanho = 0
+            _descartar(caminho_validador)
+            if _validador(response):
+                with open(caminho_validador, 'w', encoding='utf-8') as f:
+                    json.dump({'url': url, 'validador': _validador(response)}, f)
+
+        declarado = response.headers.get('Content-Length')
+        if declarado and declarado.isdigit() and tamanho + int(declarado) > max_bytes:
+            raise DownloadMuitoGrande(f"{url}: {tamanho + int(declarado)} bytes excede o limite de {max_bytes}")
+
+        with open(parcial, modo) as f:
+            for bloco in response.iter_content(chunk_size=tamanho_bloco):
+                if not bloco:
+                    continue
+                tamanho += len(bloco)
+                if tamanho > max_bytes:
+                    f.close()
+                    _descartar(parcial, caminho_validador)
+                    raise DownloadMuitoGrande(f"{url}: excede o limite de {max_bytes} bytes")
+                f.write(bloco)
+                h.update(bloco)
+
+        os.replace(parcial, destino)
+        _descartar(caminho_validador)
+        return ResultadoStream(response, destino, h.hexdigest(), tamanho)
+    finally:
+        response.close()
@@ -0,0 +1,176 @@
+"""
+Pool de WebDrivers Selenium reutilizáveis
+Evita abrir e fechar um Chrome por mercado e recicla cada driver após um
+número máximo de páginas para conter vazamentos de memória do Chrome
+"""
+import threading
+import time
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from config import SCRAPING_CONFIG
+
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def obter_chromedriver_path():
+    """Resolve o caminho do chromedriver uma única vez por processo"""
+    global _chromedriver_path
+    if _chromedriver_path is None:
+        with _chromedriver_lock:
+            if _chromedriver_path is None:
+                _chromedriver_path = ChromeDriverManager().install()
+    return _chromedriver_path
+
+
+def criar_driver():
+    """Cria um Chrome headless com as opções padrão do scraper"""
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+    if SCRAPING_CONFIG.get('capturar_json', True):
+        # Eventos de rede no log de performance (respostas JSON da página, ver respostas_json)
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    service = Service(obter_chromedriver_path())
+    return webdriver.Chrome(service=service, options=chrome_options)
+
+
+def aplicar_perfil(driver, enxuto):
+    """
+    Bloqueia (enxuto=True) ou libera as URLs de SCRAPING_CONFIG['bloquear_urls']
+    via CDP. Vale para as próximas navegações do driver, então cada página
+    define o seu perfil (o driver do pool pode vir de uma página de outro tipo)
+    """
+    urls = SCRAPING_CONFIG.get('bloquear_urls', []) if enxuto else []
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': urls})
+    except Exception as e:
+        print(f"Não foi possível aplicar o perfil do navegador: {e}")
+
+
+class DriverPool:
+    def __init__(self, max_drivers=None, max_paginas=None, fabrica=None):
+        self.max_drivers = max(1, max_drivers or SCRAPING_CONFIG.get('max_drivers', 4))
+        self.max_paginas = max_paginas or SCRAPING_CONFIG.get('max_paginas_por_driver', 20)
+        self._fabrica = fabrica or criar_driver
+        self._livres = []
+        self._paginas = {}  # id(driver) -> páginas abertas desde a criação
+        self._total = 0  # drivers vivos (livres + em uso)
+        self._cond = threading.Condition()
+        self.estatisticas = {'criados': 0, 'reutilizados': 0, 'reciclados': 0, 'descartados': 0}
+
+    def _incrementar(self, chave):
+        with self._cond:
+            self.estatisticas[chave] += 1
+
+    def _saudavel(self, driver):
+        """Verifica se o driver ainda responde (Chrome pode ter travado ou morrido)"""
+        try:
+            return bool(driver.window_handles) and driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _encerrar(self, driver):
+        """Fecha o Chrome e libera a vaga no pool"""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._paginas.pop(id(driver), None)
+            self._total -= 1
+            self._cond.notify()
+
+    def checkout(self, timeout=None):
+        """Obtém um driver do pool (reutiliza um livre ou cria um novo até o limite)"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            driver = None
+            with self._cond:
+                while not self._livres and self._total >= self.max_drivers:
+                    restante = None if limite is None else limite - time.monotonic()
+                    if restante is not None and restante <= 0:
+                        raise TimeoutError("Nenhum driver disponível no pool")
+                    self._cond.wait(restante)
+                if self._livres:
+                    driver = self._livres.pop()
+                else:
+                    self._total += 1
+
+            if driver is None:
+                try:
+                    driver = self._fabrica()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._paginas[id(driver)] = 0
+                    self.estatisticas['criados'] += 1
+                return driver
+
+            # Health check fora do lock para não bloquear outros workers
+            if self._saudavel(driver):
+                self._incrementar('reutilizados')
+                return driver
+            self._incrementar('descartados')
+            self._encerrar(driver)
+
+    def checkin(self, driver, descartar=False):
+        """Devolve o driver ao pool, reciclando-o se atingiu o limite de páginas"""
+        if driver is None:
+            return
+        with self._cond:
+            paginas = self._paginas.get(id(driver), 0)
+
+        if descartar:
+            self._incrementar('descartados')
+            self._encerrar(driver)
+            return
+        if paginas >= self.max_paginas:
+            self._incrementar('reciclados')
+            self._encerrar(driver)
+            return
+
+        try:
+            # Página em branco libera DOM/imagens da última página visitada
+            driver.get('about:blank')
+        except Exception:
+            self._incrementar('descartados')
+            self._encerrar(driver)
+            return
+
+        with self._cond:
+            self._livres.append(driver)
+            self._cond.notify()
+
+    def registrar_pagina(self, driver):
+        """Contabiliza uma página aberta pelo driver (usado para reciclagem)"""
+        with self._cond:
+            if id(driver) in self._paginas:
+                self._paginas[id(driver)] += 1
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager: checkout na entrada e checkin na saída"""
+        driver = self.checkout(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.checkin(driver)
+
+    def fechar(self):
+        """Fecha todos os drivers livres (o pool continua utilizável depois)"""
+        with self._cond:
+            livres, self._livres = self._livres, []
+        for driver in livres:
+            self._encerrar(driver)
@@ -0,0 +1,168 @@
+"""
+Armazenamento de encartes endereçado por conteúdo
+O SHA-256 dos bytes do encarte aponta para as páginas já renderizadas, e o
+SHA-256 de cada imagem de página (mais a configuração do OCR) aponta para o
+texto OCR e as caixas das palavras já extraídos. Um encarte repetido (mesmos
+bytes com outra data no nome) custa um hash e uma consulta, em vez de
+renderizar a 300 DPI e rodar o Tesseract de novo. As leituras OCR têm limite
+de tamanho em disco, descartando as usadas há mais tempo (podar_ocr, uma vez
+por lote de imagens). Não usam cache_disco.CacheDisco porque são gravadas por
+vários processos de OCR ao mesmo tempo, e o índice do CacheDisco vive na
+memória de um processo só; aqui o mtime de cada arquivo é o último uso
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import datetime
+from config import CACHE_DIR, OCR_CONFIG
+
+
+def sha256_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """SHA-256 do arquivo lido em blocos (sem carregar tudo na memória)"""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class EncarteStore:
+    def __init__(self, diretorio=None):
+        self.diretorio = diretorio or os.path.join(CACHE_DIR, 'encartes')
+        self.dir_paginas = os.path.join(self.diretorio, 'paginas')
+        self.dir_ocr = os.path.join(self.diretorio, 'ocr')
+        os.makedirs(self.dir_paginas, exist_ok=True)
+        os.makedirs(self.dir_ocr, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _dir_encarte(self, sha256):
+        return os.path.join(self.dir_paginas, sha256)
+
+    def paginas(self, sha256):
+        """Caminhos das páginas renderizadas do encarte, ou None se nunca visto"""
+        manifesto = os.path.join(self._dir_encarte(sha256), 'manifest.json')
+        try:
+            with open(manifesto, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return None
+        caminhos = [os.path.join(self._dir_encarte(sha256), p) for p in dados.get('paginas', [])]
+        if not caminhos or not all(os.path.exists(c) for c in caminhos):
+            return None
+        return caminhos
+
+    def guardar_paginas(self, sha256, image_paths):
+        """Copia as páginas renderizadas para o store (mantendo o número de cada página)"""
+        destino = self._dir_encarte(sha256)
+        with self._lock:
+            os.makedirs(destino, exist_ok=True)
+            nomes = []
+            for i, caminho in enumerate(image_paths, 1):
+                # Páginas com camada de texto não são rasterizadas: a numeração pode ter lacunas
+                numero = re.search(r'_page_(\d+)\.\w+$', caminho)
+                numero = int(numero.group(1)) if numero else i
+                nome = f"page_{numero:03d}{os.path.splitext(caminho)[1]}"
+                shutil.copyfile(caminho, os.path.join(destino, nome))
+                nomes.append(nome)
+            with open(os.path.join(destino, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'sha256': sha256,
+                    'paginas': nomes,
+                    'criado_em': datetime.now().isoformat(timespec='seconds')
+                }, f, indent=2)
+
+    def materializar_paginas(self, sha256, filename, destino_dir):
+        """Copia as páginas do store para destino_dir com os nomes {base}_page_N (sobrescrevendo); None se ausente"""
+        paginas = self.paginas(sha256)
+        if not paginas:
+            return None
+        base = filename[:-len('.pdf')] if filename.endswith('.pdf') else filename
+        image_paths = []
+        for pagina in paginas:
+            numero = int(re.search(r'page_(\d+)', os.path.basename(pagina)).group(1))
+            image_path = os.path.join(destino_dir, f"{base}_page_{numero}{os.path.splitext(pagina)[1]}")
+            # Sempre copia: encartes de semanas diferentes reaproveitam o nome
+            # (encarte.pdf), e a página de outro encarte seria lida no lugar desta
+            shutil.copyfile(pagina, image_path)
+            image_paths.append(image_path)
+        # Páginas a mais de um encarte anterior com o mesmo nome
+        prefixo = f"{base}_page_"
+        for nome in os.listdir(destino_dir):
+            caminho = os.path.join(destino_dir, nome)
+            if nome.startswith(prefixo) and caminho not in image_paths:
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
+        return image_paths
+
+    def _caminho_ocr(self, sha256_imagem, chave):
+        return os.path.join(self.dir_ocr, f"{sha256_imagem}_{chave}.json")
+
+    def obter_ocr(self, sha256_imagem, chave):
+        """
+        Leitura OCR já feita da imagem com a mesma configuração (`chave`:
+        versão do pré-processamento, idioma e PSMs): {'texto', 'palavras', 'psm'}, ou None
+        """
+        caminho = self._caminho_ocr(sha256_imagem, chave)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                leitura = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(caminho)  # último uso, para o descarte LRU
+        except OSError:
+            pass
+        return leitura
+
+    def guardar_ocr(self, sha256_imagem, chave, texto, palavras=None, psm=None):
+        """Guarda o texto bruto e as caixas das palavras ([texto, x, y, largura, altura, confiança])"""
+        caminho = self._caminho_ocr(sha256_imagem, chave)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({
+                'texto': texto,
+                'palavras': palavras,
+                'psm': psm,
+                'criado_em': datetime.now().isoformat(timespec='seconds')
+            }, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+
+    def podar_ocr(self, max_mb=None):
+        """
+        Descarta as leituras OCR usadas há mais tempo até o cache caber em
+        OCR_CONFIG['cache_ocr_max_mb']. Percorre o diretório inteiro: chamar uma
+        vez por lote (processar_imagens_mercado), não a cada leitura guardada
+        """
+        if max_mb is None:
+            max_mb = OCR_CONFIG.get('cache_ocr_max_mb', 500)
+        limite = max_mb * 1024 * 1024
+        with self._lock:
+            entradas = []
+            total = 0
+            for entrada in os.scandir(self.dir_ocr):
+                if entrada.name.endswith('.tmp'):
+                    continue
+                try:
+                    info = entrada.stat()
+                except OSError:
+                    continue
+                entradas.append((info.st_mtime, info.st_size, entrada.path))
+                total += info.st_size
+            if total <= limite:
+                return 0
+            removidas = 0
+            for _, tamanho, caminho in sorted(entradas):
+                if total <= limite:
+                    break
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    continue
+                total -= tamanho
+                removidas += 1
+            return removidas
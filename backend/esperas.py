@@ -0,0 +1,197 @@
+"""
+Esperas orientadas à prontidão da página
+Substituem os time.sleep fixos do scraper: cada espera retorna assim que a
+condição é atingida (rede ociosa, contagem de produtos estável, scrollHeight
+inalterado), limitada pelos tetos por mercado em SCRAPING_CONFIG['esperas']
+"""
+import threading
+import time
+from urllib.parse import urlparse
+from config import SCRAPING_CONFIG
+
+# Rede ociosa: documento completo e nenhum recurso terminou há `janela` ms
+JS_REDE_OCIOSA = """
+if (performance.setResourceTimingBufferSize) { performance.setResourceTimingBufferSize(10000); }
+var recursos = performance.getEntriesByType('resource');
+var ultimo = 0;
+for (var i = 0; i < recursos.length; i++) {
+    if (recursos[i].responseEnd > ultimo) { ultimo = recursos[i].responseEnd; }
+}
+return document.readyState === 'complete' && (performance.now() - ultimo) >= arguments[0];
+"""
+
+# Quantidade de padrões de preço visíveis (proxy para quantidade de produtos)
+JS_CONTAR_PRECOS = """
+var texto = document.body ? document.body.innerText : '';
+var precos = texto.match(/\\d+[,.]\\d{2}/g);
+return precos ? precos.length : 0;
+"""
+
+JS_ALTURA = "return document.body ? document.body.scrollHeight : 0;"
+
+
+def obter_limites(mercado):
+    """Limites de espera do mercado (herdando os valores padrão)"""
+    esperas = SCRAPING_CONFIG.get('esperas', {})
+    limites = dict(esperas.get('padrao', {}))
+    limites.update(esperas.get(mercado, {}))
+    return limites
+
+
+class RegistroEsperas:
+    """Acumula o tempo efetivamente esperado e o sleep fixo que cada espera substituiu"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.registros = []
+
+    def registrar(self, mercado, etapa, esperado, fixo):
+        with self._lock:
+            self.registros.append({
+                'mercado': mercado,
+                'etapa': etapa,
+                'esperado': esperado,
+                'fixo': fixo
+            })
+
+    def limpar(self):
+        with self._lock:
+            self.registros = []
+
+    def resumo(self):
+        """Totais por mercado: tempo esperado, tempo dos sleeps fixos e economia (negativa se esperou mais)"""
+        totais = {}
+        with self._lock:
+            registros = list(self.registros)
+        for r in registros:
+            t = totais.setdefault(r['mercado'], {'esperas': 0, 'esperado': 0.0, 'fixo': 0.0})
+            t['esperas'] += 1
+            t['esperado'] += r['esperado']
+            t['fixo'] += r['fixo']
+        for t in totais.values():
+            t['economizado'] = t['fixo'] - t['esperado']
+        return totais
+
+    def imprimir_resumo(self):
+        resumo = self.resumo()
+        if not resumo:
+            return
+        print("\n=== ESPERAS (prontidão vs. sleep fixo) ===")
+        for mercado, t in resumo.items():
+            print(f"  {mercado}: {t['esperas']} esperas, {t['esperado']:.1f}s esperados "
+                  f"(fixo seria {t['fixo']:.1f}s, economia de {t['economizado']:.1f}s)")
+
+
+class LimitadorHost:
+    """Garante um intervalo mínimo entre requisições ao mesmo host, entre threads"""
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo or 0
+        self._lock = threading.Lock()
+        self._proximo = {}  # host -> instante liberado para a próxima requisição
+
+    def aguardar(self, url):
+        if self.intervalo <= 0:
+            return 0
+        host = urlparse(url).netloc
+        with self._lock:
+            agora = time.monotonic()
+            vez = max(agora, self._proximo.get(host, agora))
+            self._proximo[host] = vez + self.intervalo
+        espera = vez - agora
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+
+class EsperaPagina:
+    def __init__(self, driver, mercado, registro=None):
+        self.driver = driver
+        self.mercado = mercado
+        self.registro = registro
+        self.limites = obter_limites(mercado)
+        self.intervalo = self.limites.get('intervalo', 0.25)
+
+    def _registrar(self, etapa, inicio, fixo):
+        esperado = time.perf_counter() - inicio
+        if self.registro is not None:
+            self.registro.registrar(self.mercado, etapa, esperado, fixo)
+        return esperado
+
+    def _script(self, script, *args, padrao=None):
+        try:
+            return self.driver.execute_script(script, *args)
+        except Exception:
+            return padrao
+
+    def aguardar_rede_ociosa(self, limite=None, etapa='rede_ociosa', fixo=0):
+        """Aguarda o documento completar e a rede ficar ociosa; retorna True se ficou pronta"""
+        inicio = time.perf_counter()
+        limite = self.limites.get('carregamento', 15) if limite is None else limite
+        janela_ms = self.limites.get('janela_rede', 0.5) * 1000
+        pronta = False
+        while time.perf_counter() - inicio < limite:
+            if self._script(JS_REDE_OCIOSA, janela_ms, padrao=False):
+                pronta = True
+                break
+            time.sleep(self.intervalo)
+        self._registrar(etapa, inicio, fixo)
+        return pronta
+
+    def aguardar_produtos_estaveis(self, limite=None, etapa='produtos_estaveis', fixo=0):
+        """
+        Aguarda a contagem de preços na página ficar igual por `janela_estavel`
+        segundos (uma contagem 0 só conta como estável com a rede ociosa);
+        retorna a contagem final
+        """
+        inicio = time.perf_counter()
+        limite = self.limites.get('produtos_estaveis', 10) if limite is None else limite
+        janela = self.limites.get('janela_estavel', 1.0)
+        ultima_contagem = -1
+        estavel_desde = time.perf_counter()
+        while time.perf_counter() - inicio < limite:
+            contagem = self._script(JS_CONTAR_PRECOS, padrao=0) or 0
+            agora = time.perf_counter()
+            if contagem != ultima_contagem:
+                ultima_contagem = contagem
+                estavel_desde = agora
+            elif agora - estavel_desde >= janela and (
+                    contagem > 0 or self._script(JS_REDE_OCIOSA, janela * 1000, padrao=False)):
+                # Sem preços (encartes em imagem/PDF): contagem 0 estável com a rede ociosa também é pronta
+                break
+            time.sleep(self.intervalo)
+        self._registrar(etapa, inicio, fixo)
+        return max(ultima_contagem, 0)
+
+    def rolar_ate_estabilizar(self, etapa='scroll', fixo=0):
+        """Rola até o fim repetidamente até o scrollHeight parar de crescer (lazy loading)"""
+        inicio = time.perf_counter()
+        limite_scroll = self.limites.get('scroll', 3)
+        max_scrolls = self.limites.get('max_scrolls', 5)
+        janela = self.limites.get('janela_estavel', 1.0)
+        rolagens = 0
+
+        altura = self._script(JS_ALTURA, padrao=0)
+        while rolagens < max_scrolls:
+            self._script("window.scrollTo(0, document.body.scrollHeight);")
+            rolagens += 1
+            inicio_rolagem = time.perf_counter()
+            cresceu = False
+            # Esperar o conteúdo lazy carregar: sai assim que a altura muda,
+            # ou quando a rede fica ociosa sem mudança por uma janela inteira
+            while time.perf_counter() - inicio_rolagem < limite_scroll:
+                time.sleep(self.intervalo)
+                nova_altura = self._script(JS_ALTURA, padrao=altura)
+                if nova_altura != altura:
+                    altura = nova_altura
+                    cresceu = True
+                    break
+                if (time.perf_counter() - inicio_rolagem >= janela and
+                        self._script(JS_REDE_OCIOSA, janela * 1000, padrao=False)):
+                    break
+            if not cresceu:
+                break
+
+        self._script("window.scrollTo(0, 0);")
+        self._registrar(etapa, inicio, fixo)
+        return rolagens
@@ -0,0 +1,94 @@
+"""
+Impressões digitais das páginas de categoria entre execuções
+Guarda por URL e caminho de busca (GET estático, árvore do navegador ou
+page_source) o hash dos blocos candidatos a produto (preço + nome) da página
+e os produtos extraídos dela. Se na próxima execução o hash for o mesmo, os
+produtos anteriores são reaproveitados sem rodar as estratégias de extração
+(o download e o parse do documento, de onde saem os blocos, continuam).
+Banners, contadores e carrinho não entram no hash; o que só as estratégias
+por classe/atributo veriam também não, e é pego pela reextração forçada
+após SCRAPING_CONFIG['impressoes_max_dias'] dias
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from config import CACHE_DIR, SCRAPING_CONFIG
+from padroes_preco import ESPACOS
+
+
+def impressao_blocos(blocos):
+    """SHA-256 dos blocos candidatos a produto, em ordem, com espaços normalizados (None sem blocos)"""
+    normalizados = [ESPACOS.sub(' ', bloco).strip().lower() for bloco in blocos]
+    normalizados = [bloco for bloco in normalizados if bloco]
+    if not normalizados:
+        return None
+    return hashlib.sha256('\n'.join(normalizados).encode('utf-8')).hexdigest()
+
+
+class ImpressoesPaginas:
+    def __init__(self, caminho=None, max_dias=None):
+        self.caminho = caminho or os.path.join(CACHE_DIR, 'impressoes_paginas.json')
+        if max_dias is None:
+            max_dias = SCRAPING_CONFIG.get('impressoes_max_dias', 7)
+        self.validade = timedelta(days=max_dias)
+        self._lock = threading.Lock()
+        self._dados = self._carregar()
+        # URL -> se alguma consulta da URL nesta execução reaproveitou produtos
+        # (os fallbacks de uma mesma categoria contam uma vez só)
+        self._consultas = {}
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _salvar(self):
+        temporario = self.caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._dados, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+
+    @staticmethod
+    def _chave(url, origem):
+        return f"{origem} {url}" if origem else url
+
+    @property
+    def estatisticas(self):
+        with self._lock:
+            acertos = sum(1 for acerto in self._consultas.values() if acerto)
+            return {'acertos': acertos, 'falhas': len(self._consultas) - acertos}
+
+    def produtos_se_igual(self, url, impressao, origem=None):
+        """Produtos da última extração da URL (pelo mesmo caminho) se a impressão não mudou (e não expirou), senão None"""
+        with self._lock:
+            registro = self._dados.get(self._chave(url, origem))
+            produtos = None
+            if registro and registro.get('impressao') == impressao:
+                try:
+                    extraido_em = datetime.fromisoformat(registro['extraido_em'])
+                except (KeyError, ValueError):
+                    extraido_em = None
+                if extraido_em and datetime.now() - extraido_em <= self.validade:
+                    produtos = registro.get('produtos')
+            self._consultas[url] = self._consultas.get(url, False) or bool(produtos)
+        return [dict(p) for p in produtos] if produtos else None
+
+    def guardar(self, url, impressao, produtos, origem=None):
+        with self._lock:
+            self._dados[self._chave(url, origem)] = {
+                'impressao': impressao,
+                'produtos': produtos,
+                'extraido_em': datetime.now().isoformat(timespec='seconds')
+            }
+            try:
+                self._salvar()
+            except OSError as e:
+                print(f"Erro ao salvar impressões das páginas: {e}")
+
+    def limpar_estatisticas(self):
+        with self._lock:
+            self._consultas = {}
@@ -0,0 +1,62 @@
+"""
+Memória do modo de busca por URL
+Registra se uma página rende produtos com um GET simples ('estatico') ou
+precisa do navegador ('navegador'), para não repetir a tentativa a cada execução
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from config import CACHE_DIR, SCRAPING_CONFIG
+
+ESTATICO = 'estatico'
+NAVEGADOR = 'navegador'
+
+
+class MemoriaModoBusca:
+    def __init__(self, caminho=None, reavaliar_dias=None):
+        self.caminho = caminho or os.path.join(CACHE_DIR, 'modo_busca.json')
+        if reavaliar_dias is None:
+            reavaliar_dias = SCRAPING_CONFIG.get('reavaliar_modo_dias', 7)
+        self.reavaliar = timedelta(days=reavaliar_dias)
+        self._lock = threading.Lock()
+        self._dados = self._carregar()
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _salvar(self):
+        temporario = self.caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._dados, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.caminho)
+
+    def modo(self, url):
+        """Modo lembrado para a URL, ou None se desconhecido/expirado"""
+        with self._lock:
+            registro = self._dados.get(url)
+        if not registro:
+            return None
+        try:
+            decidido_em = datetime.fromisoformat(registro['decidido_em'])
+        except (KeyError, ValueError):
+            return None
+        if datetime.now() - decidido_em > self.reavaliar:
+            return None
+        return registro.get('modo')
+
+    def lembrar(self, url, modo, produtos):
+        with self._lock:
+            self._dados[url] = {
+                'modo': modo,
+                'produtos': produtos,
+                'decidido_em': datetime.now().isoformat(timespec='seconds')
+            }
+            try:
+                self._salvar()
+            except OSError as e:
+                print(f"Erro ao salvar modo de busca: {e}")
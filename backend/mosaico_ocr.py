@@ -0,0 +1,145 @@
+"""
+OCR em ladrilhos para páginas grandes (encartes a 300 DPI)
+A página binarizada é dividida em ladrilhos com lado perto de
+OCR_CONFIG['ladrilho_max_lado'], com os cortes nas faixas mais brancas
+(calhas entre colunas e entre linhas de cards) perto da divisão ideal, e com
+uma sobreposição nas bordas. Os ladrilhos passam pelo OCR em threads (cada uma
+com seu motor) e as palavras voltam para as coordenadas da página; as que
+aparecem nas duas sobreposições ficam uma vez só. Cada Tesseract fica limitado a
+OMP_THREAD_LIMIT threads internas (motor_ocr.limitar_threads_tesseract, ao criar
+o motor), e o número de threads de ladrilhos é dividido por esse limite
+"""
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from config import OCR_CONFIG
+from motor_ocr import motor_ocr
+
+CHAVES_DADOS = ['block_num', 'par_num', 'line_num', 'left', 'top', 'width', 'height', 'conf', 'text']
+
+# Threads dos ladrilhos (e seus motores) são reaproveitadas entre páginas; um executor por processo e tamanho
+_executores = {}
+_lock_executores = threading.Lock()
+
+
+def precisa_ladrilhos(imagem):
+    """True se a imagem (array) tem algum lado maior que OCR_CONFIG['ladrilho_max_lado']"""
+    if not OCR_CONFIG.get('ocr_em_ladrilhos', True):
+        return False
+    return max(imagem.shape[:2]) > OCR_CONFIG.get('ladrilho_max_lado', 1800)
+
+
+def cortes_em_calhas(tinta, max_lado):
+    """Posições de corte em um eixo: perto da divisão ideal, na faixa com menos tinta"""
+    tamanho = len(tinta)
+    partes = math.ceil(tamanho / max_lado)
+    janela = tamanho // (4 * partes)
+    cortes = []
+    for k in range(1, partes):
+        ideal = k * tamanho // partes
+        inicio, fim = max(0, ideal - janela), min(tamanho, ideal + janela + 1)
+        faixa = tinta[inicio:fim]
+        # Menos tinta; no empate (várias linhas em branco), a mais perto da divisão ideal
+        candidatos = np.flatnonzero(faixa == faixa.min()) + inicio
+        cortes.append(int(candidatos[np.argmin(np.abs(candidatos - ideal))]))
+    return [0] + cortes + [tamanho]
+
+
+def dividir_em_ladrilhos(imagem, max_lado=None):
+    """Núcleos (x0, y0, x1, y1) dos ladrilhos, sem sobreposição, em ordem de leitura (linha a linha)"""
+    max_lado = max_lado or OCR_CONFIG.get('ladrilho_max_lado', 1800)
+    # Imagem binarizada: o fundo é a cor que predomina, tinta é o resto
+    fundo = 255 if imagem.mean() > 127 else 0
+    tinta = imagem != fundo
+    linhas = cortes_em_calhas(tinta.sum(axis=1), max_lado)
+    colunas = cortes_em_calhas(tinta.sum(axis=0), max_lado)
+    return [
+        (x0, y0, x1, y1)
+        for y0, y1 in zip(linhas, linhas[1:])
+        for x0, x1 in zip(colunas, colunas[1:])
+    ]
+
+
+def expandir(nucleo, sobreposicao, largura, altura):
+    x0, y0, x1, y1 = nucleo
+    return (max(0, x0 - sobreposicao), max(0, y0 - sobreposicao),
+            min(largura, x1 + sobreposicao), min(altura, y1 + sobreposicao))
+
+
+def _ocr_ladrilho(imagem, caixa, psm):
+    x0, y0, x1, y1 = caixa
+    # Cópia contígua só do ladrilho: é o que o motor converte para o Tesseract
+    return motor_ocr().dados(np.ascontiguousarray(imagem[y0:y1, x0:x1]), psm)
+
+
+def _workers(workers=None):
+    """`workers`, OCR_CONFIG['workers_ladrilhos'] ou, se None, núcleos / threads internas de cada Tesseract"""
+    workers = workers or OCR_CONFIG.get('workers_ladrilhos')
+    if workers:
+        return workers
+    try:
+        threads = max(1, int(os.environ.get('OMP_THREAD_LIMIT') or OCR_CONFIG.get('threads_tesseract', 1)))
+    except ValueError:
+        threads = 1
+    return max(1, (os.cpu_count() or 1) // threads)
+
+
+def _executor(workers):
+    with _lock_executores:
+        executor = _executores.get((os.getpid(), workers))
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ladrilho')
+            _executores[(os.getpid(), workers)] = executor
+        return executor
+
+
+def _sobrepoe(a, b, minimo=0.5):
+    """Interseção sobre união das caixas (x, y, largura, altura) >= minimo"""
+    largura = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    altura = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    if largura <= 0 or altura <= 0:
+        return False
+    intersecao = largura * altura
+    return intersecao / (a[2] * a[3] + b[2] * b[3] - intersecao) >= minimo
+
+
+def dados_em_ladrilhos(imagem, psm, workers=None):
+    """
+    OCR da imagem em ladrilhos, no formato de image_to_data(Output.DICT), com
+    as caixas em coordenadas da página. Cada ladrilho vira um grupo de blocos
+    próprio; uma palavra da sobreposição já lida em um ladrilho anterior (mesmo
+    texto, caixas sobrepostas) é descartada. workers: threads de ladrilhos
+    (None = OCR_CONFIG['workers_ladrilhos'])
+    """
+    altura, largura = imagem.shape[:2]
+    sobreposicao = OCR_CONFIG.get('ladrilho_sobreposicao', 40)
+    nucleos = dividir_em_ladrilhos(imagem)
+    caixas = [expandir(nucleo, sobreposicao, largura, altura) for nucleo in nucleos]
+    workers = _workers(workers)
+    if len(caixas) == 1 or workers == 1:
+        resultados = [_ocr_ladrilho(imagem, caixa, psm) for caixa in caixas]
+    else:
+        resultados = _executor(workers).map(lambda caixa: _ocr_ladrilho(imagem, caixa, psm), caixas)
+
+    dados = {chave: [] for chave in CHAVES_DADOS}
+    # Só palavras a menos de `sobreposicao` da borda do núcleo aparecem também em outro ladrilho
+    bordas = []  # (texto, caixa)
+    for indice, ((x0, y0, _, _), (n0, m0, n1, m1), parcial) in enumerate(zip(caixas, nucleos, resultados)):
+        for i, texto in enumerate(parcial['text']):
+            texto = texto.strip()
+            if not texto:
+                continue
+            caixa = (parcial['left'][i] + x0, parcial['top'][i] + y0, parcial['width'][i], parcial['height'][i])
+            na_borda = (caixa[0] < n0 + sobreposicao or caixa[1] < m0 + sobreposicao
+                        or caixa[0] + caixa[2] > n1 - sobreposicao or caixa[1] + caixa[3] > m1 - sobreposicao)
+            if na_borda:
+                if any(texto.lower() == outro and _sobrepoe(caixa, outra) for outro, outra in bordas):
+                    continue
+                bordas.append((texto.lower(), caixa))
+            valores = [indice * 1000 + int(parcial['block_num'][i]), parcial['par_num'][i], parcial['line_num'][i],
+                       caixa[0], caixa[1], caixa[2], caixa[3], parcial['conf'][i], texto]
+            for chave, valor in zip(CHAVES_DADOS, valores):
+                dados[chave].append(valor)
+    return dados
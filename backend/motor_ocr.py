@@ -0,0 +1,154 @@
+"""
+Motores de OCR
+O OCR (OCRProcessor, OCRProcessorAvancado, selecao_psm) usa apenas a
+interface de MotorOCR, então roda com qualquer motor:
+  - 'tesserocr':   API C do Tesseract no próprio processo; o modelo (traineddata)
+                   é carregado uma vez por processo e reaproveitado entre PSMs,
+                   imagens e regiões
+  - 'pytesseract': um processo `tesseract` (e uma imagem temporária) por chamada
+O motor vem de OCR_CONFIG['motor_ocr']; se tesserocr não estiver instalado (ou
+não iniciar), cai para 'pytesseract'. Cada thread tem o seu motor.
+O tesserocr só é importado ao criar o primeiro motor, depois de
+limitar_threads_tesseract: importar este módulo não altera o ambiente do processo
+"""
+import importlib
+import importlib.util
+import os
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+from PIL import Image
+import pytesseract
+from config import OCR_CONFIG
+
+tesserocr = None
+
+
+def limitar_threads_tesseract():
+    """
+    Limita as threads internas (OpenMP) de cada Tesseract a OCR_CONFIG['threads_tesseract'].
+    A libgomp só lê OMP_THREAD_LIMIT ao ser carregada, então a chamada tem que vir
+    antes do import do tesserocr; os subprocessos do pytesseract herdam o valor.
+    Um OMP_THREAD_LIMIT já definido no ambiente prevalece
+    """
+    os.environ.setdefault('OMP_THREAD_LIMIT', str(OCR_CONFIG.get('threads_tesseract', 1)))
+
+
+def _importar_tesserocr():
+    global tesserocr
+    if tesserocr is None:
+        tesserocr = importlib.import_module('tesserocr')
+    return tesserocr
+
+
+def nome_motor_ocr():
+    """Nome do motor que motor_ocr() usa (ou usaria), sem criar um motor nem carregar o Tesseract"""
+    motor = getattr(_local, 'motor', None)
+    if motor is not None and _local.pid == os.getpid():
+        return motor.nome
+    if OCR_CONFIG.get('motor_ocr', 'tesserocr') == 'tesserocr' and importlib.util.find_spec('tesserocr'):
+        return MotorTesserocr.nome
+    return MotorPytesseract.nome
+
+
+class MotorOCR(ABC):
+    """Interface usada pelo OCR"""
+    nome = None
+
+    @abstractmethod
+    def texto(self, imagem, psm):
+        """Texto da imagem (array do OpenCV ou PIL.Image), como image_to_string"""
+
+    @abstractmethod
+    def dados(self, imagem, psm):
+        """Palavras com caixa, confiança e bloco/parágrafo/linha, no formato de image_to_data(Output.DICT)"""
+
+
+class MotorPytesseract(MotorOCR):
+    nome = 'pytesseract'
+
+    def __init__(self, lang):
+        self.lang = lang
+
+    def texto(self, imagem, psm):
+        return pytesseract.image_to_string(imagem, config=f'-l {self.lang} --psm {psm}')
+
+    def dados(self, imagem, psm):
+        return pytesseract.image_to_data(imagem, config=f'-l {self.lang} --psm {psm}',
+                                         output_type=pytesseract.Output.DICT)
+
+
+class MotorTesserocr(MotorOCR):
+    nome = 'tesserocr'
+
+    def __init__(self, lang):
+        _importar_tesserocr()
+        caminho = OCR_CONFIG.get('tessdata')
+        self.api = tesserocr.PyTessBaseAPI(path=caminho, lang=lang) if caminho else tesserocr.PyTessBaseAPI(lang=lang)
+        # A API não é thread-safe: uma chamada por vez por motor
+        self._lock = threading.Lock()
+
+    def _preparar(self, imagem, psm):
+        if isinstance(imagem, np.ndarray):
+            imagem = Image.fromarray(imagem)
+        self.api.SetPageSegMode(psm)
+        self.api.SetImage(imagem)
+
+    def texto(self, imagem, psm):
+        with self._lock:
+            self._preparar(imagem, psm)
+            return self.api.GetUTF8Text()
+
+    def dados(self, imagem, psm):
+        chaves = ['block_num', 'par_num', 'line_num', 'left', 'top', 'width', 'height', 'conf', 'text']
+        dados = {chave: [] for chave in chaves}
+        RIL = tesserocr.RIL
+        with self._lock:
+            self._preparar(imagem, psm)
+            self.api.Recognize()
+            iterador = self.api.GetIterator()
+            bloco = paragrafo = linha = 0
+            if iterador is None:
+                return dados
+            for palavra in tesserocr.iterate_level(iterador, RIL.WORD):
+                if palavra.IsAtBeginningOf(RIL.BLOCK):
+                    bloco += 1
+                    paragrafo = linha = 0
+                if palavra.IsAtBeginningOf(RIL.PARA):
+                    paragrafo += 1
+                    linha = 0
+                if palavra.IsAtBeginningOf(RIL.TEXTLINE):
+                    linha += 1
+                caixa = palavra.BoundingBox(RIL.WORD)
+                if caixa is None:
+                    continue
+                x1, y1, x2, y2 = caixa
+                valores = [bloco, paragrafo, linha, x1, y1, x2 - x1, y2 - y1,
+                           palavra.Confidence(RIL.WORD), palavra.GetUTF8Text(RIL.WORD) or '']
+                for chave, valor in zip(chaves, valores):
+                    dados[chave].append(valor)
+        return dados
+
+
+# Um motor por thread (os ladrilhos de mosaico_ocr rodam em threads) e por
+# processo: a API do tesserocr não atravessa o fork dos workers de OCR
+_local = threading.local()
+
+
+def motor_ocr():
+    """Motor de OCR desta thread (OCR_CONFIG['motor_ocr'], com fallback para pytesseract)"""
+    motor = getattr(_local, 'motor', None)
+    if motor is None or _local.pid != os.getpid():
+        motor = None
+        lang = OCR_CONFIG['lang']
+        limitar_threads_tesseract()
+        if OCR_CONFIG.get('motor_ocr', 'tesserocr') == 'tesserocr':
+            try:
+                motor = MotorTesserocr(lang)
+            except ImportError:
+                pass
+            except Exception as e:
+                print(f"tesserocr indisponível ({e}); usando pytesseract")
+        _local.motor = motor or MotorPytesseract(lang)
+        _local.pid = os.getpid()
+    return _local.motor
@@ -3,16 +3,110 @@ from PIL import Image
 import re
 import pandas as pd
 from datetime import datetime
+import itertools
 import os
+import atexit
+from collections import deque
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from config import OCR_CONFIG, CSV_DIR, IMAGES_DIR
+from encarte_store import EncarteStore, sha256_arquivo
+from pdf_texto import extrair_paginas_texto
+from rasterizador import renderizar_paginas, dpi_mercado
+from motor_ocr import motor_ocr, nome_motor_ocr
+from selecao_psm import SelecaoPSM, ocr_psms, texto_de_dados, palavras_de_dados
+from mosaico_ocr import precisa_ladrilhos, dados_em_ladrilhos
+from padroes_preco import ler_linha, CONTINUACAO_PRECO, CONTINUACAO_QTD, ESPACOS
 import cv2
 import numpy as np
+import fitz  # PyMuPDF
+
+# Incrementar ao mudar preprocess_image / extract_text: invalida o OCR guardado no store
+VERSAO_PREPROCESSAMENTO = 1
+VERSAO_OCR = 3
+
+
+def chave_ocr(psms):
+    """Configuração que produziu uma leitura OCR: pré-processamento, idioma, PSMs, modo, ladrilhos e motor"""
+    modo = 'adaptativo' if OCR_CONFIG.get('psm_adaptativo') else 'todos'
+    psms = '.'.join(str(psm) for psm in sorted(psms))
+    ladrilhos = (f"-l{OCR_CONFIG.get('ladrilho_max_lado', 1800)}s{OCR_CONFIG.get('ladrilho_sobreposicao', 40)}"
+                 if OCR_CONFIG.get('ocr_em_ladrilhos', True) else '')
+    return f"v{VERSAO_OCR}-p{VERSAO_PREPROCESSAMENTO}-{OCR_CONFIG['lang']}-psm{psms}-{modo}{ladrilhos}-{nome_motor_ocr()}"
+
+# Um OCRProcessor por processo do pool de OCR (criado no initializer). As threads
+# internas do Tesseract são limitadas ao criar o motor (motor_ocr.limitar_threads_tesseract)
+_processador_worker = None
+
+# Pool de OCR de vida longa (um por processo): os workers e os motores carregados
+# neles são reaproveitados entre PDFs, mercados e chamadas de ocr_imagens
+_pools_ocr = {}
+_lock_pools_ocr = threading.Lock()
+
+
+def _iniciar_worker_ocr():
+    """Initializer dos processos de OCR"""
+    global _processador_worker
+    # As imagens já rodam em paralelo entre os processos: ladrilhos em série dentro de cada um
+    _processador_worker = OCRProcessor(workers_ladrilhos=OCR_CONFIG.get('workers_ladrilhos') or 1)
+
+
+def _pool_ocr():
+    """Pool de OCR deste processo (OCR_CONFIG['workers_ocr'] processos), criado na primeira chamada"""
+    with _lock_pools_ocr:
+        pool = _pools_ocr.get(os.getpid())
+        if pool is None:
+            workers = OCR_CONFIG.get('workers_ocr') or os.cpu_count() or 1
+            pool = ProcessPoolExecutor(max_workers=max(1, min(workers, os.cpu_count() or 1)),
+                                       initializer=_iniciar_worker_ocr)
+            _pools_ocr[os.getpid()] = pool
+        return pool
+
+
+def _descartar_pool_ocr(pool):
+    """Tira do cache um pool quebrado (worker morto); a próxima chamada cria outro"""
+    with _lock_pools_ocr:
+        if _pools_ocr.get(os.getpid()) is pool:
+            del _pools_ocr[os.getpid()]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fechar_pool_ocr():
+    """Encerra o pool de OCR deste processo (o próximo ocr_imagens cria outro)"""
+    with _lock_pools_ocr:
+        pool = _pools_ocr.pop(os.getpid(), None)
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# Quem não chamar OCRProcessor.fechar não deixa workers órfãos ao sair
+atexit.register(fechar_pool_ocr)
+
+
+def _ocr_tarefa(tarefa):
+    image_path, psms, explorar = tarefa
+    try:
+        return _processador_worker._ocr_cache(image_path, psms, explorar)
+    except Exception as e:
+        print(f"Erro ao processar OCR em {image_path}: {e}")
+        return "", None
+
 
 class OCRProcessor:
-    def __init__(self):
+    def __init__(self, workers_ladrilhos=None):
         # Configurar caminho do Tesseract se necessário (Windows)
         # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-        pass
+        # Texto OCR por SHA-256 da imagem (imagens repetidas não passam pelo Tesseract de novo)
+        self.encarte_store = EncarteStore()
+        # PSM que deu a melhor leitura em cada mercado (modo OCR_CONFIG['psm_adaptativo'])
+        self.selecao_psm = SelecaoPSM()
+        # Threads de ladrilhos por página (None = OCR_CONFIG['workers_ladrilhos']; 1 nos workers de OCR)
+        self.workers_ladrilhos = workers_ladrilhos
+    
+    def fechar(self):
+        """Encerra os processos de OCR (o processador continua utilizável depois)"""
+        fechar_pool_ocr()
     
     def preprocess_image(self, image_path):
         """Melhora a qualidade da imagem para OCR"""
@@ -34,50 +128,149 @@ class OCRProcessor:
         
         return thresh
     
-    def extract_text(self, image_path):
+    def _ocr(self, image_path, psms, explorar=False):
+        """
+        (texto, relatorio) de uma imagem. No modo adaptativo roda os PSMs na ordem
+        dada até uma leitura boa o bastante (todos, se `explorar`); senão roda todos
+        e fica com o texto mais longo.
+        Nos dois modos o relatorio traz o PSM escolhido e as caixas das palavras da leitura
+        """
+        processed_img = self.preprocess_image(image_path)
+        if OCR_CONFIG.get('psm_adaptativo'):
+            limiar = None if explorar else OCR_CONFIG.get('limiar_psm', 0.6)
+            return ocr_psms(processed_img, psms, limiar=limiar,
+                            workers_ladrilhos=self.workers_ladrilhos)
+        
+        motor = motor_ocr()
+        if precisa_ladrilhos(processed_img):
+            ler = lambda psm: dados_em_ladrilhos(processed_img, psm, self.workers_ladrilhos)
+        else:
+            ler = lambda psm: motor.dados(processed_img, psm)
+        leituras = []
+        falhas = 0
+        for psm in psms:
+            try:
+                dados = ler(psm)
+            except Exception:
+                falhas += 1
+                continue
+            texto = texto_de_dados(dados)
+            if len(texto.strip()) > 10:
+                leituras.append((psm, texto, dados))
+        
+        relatorio = {'comparadas': len(leituras), 'tentativas': len(psms), 'falhas': falhas, 'economizadas': 0}
+        if not leituras:
+            # Fallback: usar configuração padrão
+            relatorio['tentativas'] += 1
+            dados = ler(OCR_CONFIG["psm"])
+            leituras.append((OCR_CONFIG["psm"], texto_de_dados(dados), dados))
+        # Retornar o texto mais completo
+        psm, texto, dados = max(leituras, key=lambda l: len(l[1]))
+        relatorio.update(psm=psm, palavras=palavras_de_dados(dados))
+        return texto, relatorio
+    
+    def _psms(self, mercado_nome):
+        """PSMs a tentar: 6 (bloco uniforme), 11 (texto esparso) e 3 (automático), na ordem aprendida do mercado"""
+        return self.selecao_psm.ordem(mercado_nome, OCR_CONFIG.get('psms', [6, 11, 3]))
+    
+    def extract_text(self, image_path, mercado_nome=None):
         """Extrai texto de uma imagem usando OCR com múltiplas estratégias para capturar mais produtos"""
-        textos = []
         try:
-            # Pré-processar imagem
-            processed_img = self.preprocess_image(image_path)
-            
-            # Estratégia 1: PSM 6 (bloco uniforme de texto) - padrão
-            try:
-                custom_config = f'-l {OCR_CONFIG["lang"]} --psm 6'
-                texto1 = pytesseract.image_to_string(processed_img, config=custom_config)
-                if texto1 and len(texto1.strip()) > 10:
-                    textos.append(texto1)
-            except:
-                pass
-            
-            # Estratégia 2: PSM 11 (texto esparso) - para layouts complexos
-            try:
-                custom_config = f'-l {OCR_CONFIG["lang"]} --psm 11'
-                texto2 = pytesseract.image_to_string(processed_img, config=custom_config)
-                if texto2 and len(texto2.strip()) > 10:
-                    textos.append(texto2)
-            except:
-                pass
-            
-            # Estratégia 3: PSM 3 (bloco totalmente automático) - fallback
-            try:
-                custom_config = f'-l {OCR_CONFIG["lang"]} --psm 3'
-                texto3 = pytesseract.image_to_string(processed_img, config=custom_config)
-                if texto3 and len(texto3.strip()) > 10:
-                    textos.append(texto3)
-            except:
-                pass
-            
-            # Retornar o texto mais completo
-            if textos:
-                return max(textos, key=len)
-            else:
-                # Fallback: usar configuração padrão
-                custom_config = f'-l {OCR_CONFIG["lang"]} --psm {OCR_CONFIG["psm"]}'
-                return pytesseract.image_to_string(processed_img, config=custom_config)
+            texto, relatorio = self._ocr(image_path, self._psms(mercado_nome),
+                                         self.selecao_psm.explorar(mercado_nome))
         except Exception as e:
             print(f"Erro ao processar OCR em {image_path}: {e}")
             return ""
+        self.selecao_psm.registrar(mercado_nome, relatorio)
+        return texto
+    
+    def _ocr_cache(self, image_path, psms, explorar=False):
+        """_ocr reaproveitando a leitura de uma imagem idêntica já processada (relatorio None no acerto)"""
+        chave = chave_ocr(psms)
+        sha256 = sha256_arquivo(image_path)
+        leitura = self.encarte_store.obter_ocr(sha256, chave)
+        if leitura is not None:
+            print(f"  -> OCR reaproveitado do store ({sha256[:12]})")
+            return leitura['texto'], None
+        
+        try:
+            texto, relatorio = self._ocr(image_path, psms, explorar)
+        except Exception as e:
+            print(f"Erro ao processar OCR em {image_path}: {e}")
+            return "", None
+        palavras = relatorio.pop('palavras', None) if relatorio else None
+        if texto and texto.strip():
+            self.encarte_store.guardar_ocr(sha256, chave, texto, palavras,
+                                           psm=relatorio.get('psm') if relatorio else None)
+        return texto, relatorio
+    
+    def ocr_do_cache(self, image_path, mercado_nome=None):
+        """Texto OCR já guardado para a imagem com a configuração atual, sem rodar o Tesseract (None se ausente)"""
+        leitura = self.encarte_store.obter_ocr(sha256_arquivo(image_path), chave_ocr(self._psms(mercado_nome)))
+        return leitura['texto'] if leitura else None
+    
+    def extract_text_cache(self, image_path, mercado_nome=None):
+        """extract_text reaproveitando o texto de uma imagem idêntica já processada"""
+        texto, relatorio = self._ocr_cache(image_path, self._psms(mercado_nome),
+                                           self.selecao_psm.explorar(mercado_nome))
+        self.selecao_psm.registrar(mercado_nome, relatorio)
+        return texto
+    
+    def ocr_imagens(self, itens, mercado_nome=None, workers=None, somente_cache=False):
+        """
+        Gerador de (chave, caminho, texto) para cada (chave, caminho) de `itens`,
+        na ordem de `itens`. Com workers > 1 as imagens passam pelo OCR no pool de
+        processos (OCR_CONFIG['workers_ocr']), com o Tesseract limitado a
+        OCR_CONFIG['threads_tesseract'] threads para não disputar os núcleos.
+        somente_cache: só as imagens com OCR já guardado, sem rodar o Tesseract
+        """
+        if somente_cache:
+            for chave, image_path in itens:
+                texto = self.ocr_do_cache(image_path, mercado_nome)
+                if texto is None:
+                    print(f"  -> Sem OCR guardado para {os.path.basename(image_path)}")
+                else:
+                    yield chave, image_path, texto
+            return
+        if workers is None:
+            workers = OCR_CONFIG.get('workers_ocr') or os.cpu_count() or 1
+        workers = max(1, min(workers, os.cpu_count() or 1))
+        if isinstance(itens, (list, tuple)):
+            workers = max(1, min(workers, len(itens)))
+
+        if workers == 1:
+            for chave, image_path in itens:
+                yield chave, image_path, self.extract_text_cache(image_path, mercado_nome)
+            return
+
+        # A ordem dos PSMs e as imagens de exploração são decididas aqui; o
+        # aprendizado fica no processo principal.
+        # `itens` pode ser um gerador (páginas renderizadas sob demanda): cada imagem
+        # vai para o pool assim que chega, com no máximo 2 * workers pendentes
+        psms = self._psms(mercado_nome)
+        pendentes = deque()
+        executor = _pool_ocr()
+        try:
+            for chave, image_path in itens:
+                pendentes.append((chave, image_path, executor.submit(
+                    _ocr_tarefa, (image_path, psms, self.selecao_psm.explorar(mercado_nome)))))
+                if len(pendentes) >= 2 * workers:
+                    yield self._resultado_ocr(pendentes.popleft(), mercado_nome)
+            while pendentes:
+                yield self._resultado_ocr(pendentes.popleft(), mercado_nome)
+        except BrokenProcessPool:
+            _descartar_pool_ocr(executor)
+            raise
+        finally:
+            # Gerador abandonado no meio: não deixar OCR pendente ocupando o pool
+            for _, _, futuro in pendentes:
+                futuro.cancel()
+    
+    def _resultado_ocr(self, pendente, mercado_nome):
+        chave, image_path, futuro = pendente
+        texto, relatorio = futuro.result()
+        self.selecao_psm.registrar(mercado_nome, relatorio)
+        return chave, image_path, texto
     
     def identificar_segmento(self, produto_nome):
         """Identifica o segmento do produto baseado no nome"""
@@ -262,8 +455,8 @@ class OCRProcessor:
                     break
                 
                 # Verificar se próxima linha parece ser continuação (tem preço, quantidade, ou é curta)
-                tem_preco = bool(re.search(r'R\$\s*\d+|(\d+)[,.]\d{2}', linha_seguinte, re.IGNORECASE))
-                tem_qtd = bool(re.search(r'(\d+)\s*(kg|g|L|ml|un)', linha_seguinte, re.IGNORECASE))
+                tem_preco = bool(CONTINUACAO_PRECO.search(linha_seguinte))
+                tem_qtd = bool(CONTINUACAO_QTD.search(linha_seguinte))
                 eh_curta = len(linha_seguinte) < 30
                 
                 if tem_preco or tem_qtd or (eh_curta and not linha_seguinte[0].isupper()):
@@ -283,90 +476,15 @@ class OCRProcessor:
                 i += 1
                 continue
             
-            # Padrão para preço: R$ XX,XX ou R$XX,XX ou XX,XX (EXPANDIDO)
-            preco_patterns = [
-                r'R\$\s*(\d+)[,.](\d{2})',  # R$ 12,99
-                r'R\$\s*(\d+)[,.](\d{2})',  # R$12,99
-                r'(\d+)[,.](\d{2})\s*R\$',  # 12,99 R$
-                r'(\d+)[,.](\d{2})\s*reais',  # 12,99 reais
-                r'preco[:\s]*(\d+)[,.](\d{2})',  # preço: 12,99
-                r'preço[:\s]*(\d+)[,.](\d{2})',  # preco: 12,99
-                r'por\s*R\$\s*(\d+)[,.](\d{2})',  # por R$ 12,99
-                r'apenas\s*R\$\s*(\d+)[,.](\d{2})',  # apenas R$ 12,99
-                r'(\d+)[,.](\d{2})',  # 12,99 (sem R$, último recurso)
-                r'R\$\s*(\d+)',  # R$ 12 (sem centavos)
-                r'(\d+)\s*reais'  # 12 reais
-            ]
-            
-            preco_match = None
-            preco_valor = None
-            for pattern in preco_patterns:
-                preco_match = re.search(pattern, linha, re.IGNORECASE)
-                if preco_match:
-                    try:
-                        if len(preco_match.groups()) >= 2:
-                            # Formato com centavos
-                            preco_valor = float(f"{preco_match.group(1)}.{preco_match.group(2)}")
-                        else:
-                            # Formato sem centavos
-                            preco_valor = float(preco_match.group(1))
-                        break
-                    except (ValueError, IndexError):
-                        continue
-            
-            if not preco_match or preco_valor is None or preco_valor <= 0:
+            # Preço, quantidade e unidade em uma leitura da linha (padroes_preco)
+            leitura = ler_linha(linha)
+            if leitura is None:
                 i += 1
                 continue
             
-            preco = preco_valor
-            
-            # Remover preço da linha para processar o resto
-            linha_sem_preco = re.sub(r'R\$\s*\d+[,.]\d{2}|\d+[,.]\d{2}\s*R\$|\d+[,.]\d{2}', '', linha, flags=re.IGNORECASE).strip()
-            
-            # Padrão para quantidade: Xkg, Xg, XL, Xml, etc. (EXPANDIDO)
-            qtd_patterns = [
-                r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac|und|unid|unidade|und\.|un\.)',
-                r'(\d+(?:[,.]\d+)?)\s*(quilo|quilos|grama|gramas|litro|litros|mililitro|mililitros)',
-                r'(\d+)\s*x\s*(\d+)\s*(g|kg|ml|L)',  # 4 x 250ml
-                r'(\d+)\s*unidades',  # 4 unidades
-                r'(\d+)\s*un\.',  # 4 un.
-                r'pacote\s*(\d+)\s*(g|kg|ml|L)',  # pacote 500g
-                r'(\d+)\s*ml',  # 250ml (sem espaço)
-                r'(\d+)\s*kg',  # 5kg (sem espaço)
-                r'(\d+)\s*g',  # 500g (sem espaço)
-                r'(\d+)\s*L',  # 1L (sem espaço)
-            ]
-            
-            quantidade = None
-            for pattern in qtd_patterns:
-                qtd_match = re.search(pattern, linha_sem_preco, re.IGNORECASE)
-                if qtd_match:
-                    try:
-                        if len(qtd_match.groups()) == 3:  # Formato 4 x 250ml
-                            num1 = float(qtd_match.group(1).replace(',', '.'))
-                            num2 = float(qtd_match.group(2).replace(',', '.'))
-                            unidade = qtd_match.group(3).lower()
-                            total = int(num1 * num2)
-                            quantidade = f"{total}{unidade}"
-                        else:
-                            num = qtd_match.group(1).replace(',', '.')
-                            unidade = qtd_match.group(2).lower() if len(qtd_match.groups()) >= 2 else 'un'
-                            # Normalizar unidade
-                            if unidade in ['quilo', 'quilos']:
-                                unidade = 'kg'
-                            elif unidade in ['grama', 'gramas']:
-                                unidade = 'g'
-                            elif unidade in ['litro', 'litros']:
-                                unidade = 'L'
-                            elif unidade in ['mililitro', 'mililitros']:
-                                unidade = 'ml'
-                            elif unidade in ['un', 'und', 'unid', 'unidade', 'pct', 'pac', 'und.', 'un.']:
-                                unidade = 'un'
-                            quantidade = f"{num}{unidade}"
-                        linha_sem_preco = re.sub(pattern, '', linha_sem_preco, flags=re.IGNORECASE).strip()
-                        break
-                    except (ValueError, IndexError):
-                        continue
+            preco = leitura.preco
+            quantidade = leitura.quantidade
+            linha_sem_preco = leitura.resto
             
             # Identificar marca
             marca = None
@@ -408,7 +526,7 @@ class OCRProcessor:
                     marca = 'Genérico'
             
             # Limpar e normalizar nome do produto
-            produto_nome = re.sub(r'\s+', ' ', produto_nome).strip()
+            produto_nome = ESPACOS.sub(' ', produto_nome).strip()
             produto_nome = produto_nome.title()
             
             # Identificar segmento
@@ -433,46 +551,118 @@ class OCRProcessor:
         
         return produtos
     
-    def processar_imagens_mercado(self, mercado_nome):
-        """Processa todas as imagens de um mercado"""
+    def processar_pdf(self, pdf_path, mercado_nome=None, somente_cache=False):
+        """
+        Processa um encarte PDF: camada de texto quando houver, senão OCR página a página
+        (somente_cache: só as páginas já rasterizadas com OCR guardado)
+        """
+        produtos = []
+        if OCR_CONFIG.get('usar_texto_pdf', True):
+            paginas = extrair_paginas_texto(pdf_path)
+        else:
+            with fitz.open(pdf_path) as doc:
+                paginas = [{'pagina': n, 'tem_texto': False} for n in range(1, len(doc) + 1)]
+        
+        sem_texto = []
+        for pagina in paginas:
+            if pagina['tem_texto']:
+                produtos.extend(self.limpar_dados_mercado(pagina['texto'], mercado_nome))
+            else:
+                sem_texto.append(pagina['pagina'])
+        if len(sem_texto) < len(paginas):
+            print(f"  -> {len(produtos)} produtos da camada de texto ({len(paginas) - len(sem_texto)} páginas sem OCR)")
+        
+        # Reaproveitar páginas já rasterizadas pelo scraper e renderizar as que faltam;
+        # cada página renderizada vai para o OCR assim que fica pronta
+        base = pdf_path[:-len('.pdf')]
+        existentes = []
+        faltando = []
+        for numero in sem_texto:
+            caminho = next((f"{base}_page_{numero}{ext}" for ext in ('.jpg', '.png')
+                            if os.path.exists(f"{base}_page_{numero}{ext}")), None)
+            if caminho:
+                existentes.append((numero, caminho))
+            else:
+                faltando.append(numero)
+        imagens = itertools.chain(
+            existentes,
+            renderizar_paginas(pdf_path, faltando, base, dpi=dpi_mercado(mercado_nome))
+            if faltando and not somente_cache else []
+        )
+        for numero, image_path, texto in self.ocr_imagens(imagens, mercado_nome, somente_cache=somente_cache):
+            if texto and len(texto.strip()) > 10:
+                produtos_pagina = self.limpar_dados_mercado(texto, mercado_nome)
+                print(f"  -> {len(produtos_pagina)} produtos extraídos da página {numero} ({os.path.basename(image_path)})")
+                produtos.extend(produtos_pagina)
+            else:
+                print(f"  -> Nenhum texto extraído da página {numero}")
+        return produtos
+    
+    def processar_imagens_mercado(self, mercado_nome, somente_cache=False):
+        """
+        Processa todas as imagens de um mercado. somente_cache: reaplica os parsers
+        ao OCR já guardado, sem Tesseract (para iterar em limpar_dados_mercado)
+        """
         produtos_todos = []
+        self.selecao_psm.limpar_estatisticas()
         
         # Verificar se o diretório existe
         if not os.path.exists(IMAGES_DIR):
             print(f"Diretório {IMAGES_DIR} não existe")
             return produtos_todos
         
-        # Buscar imagens do mercado (incluindo PDFs convertidos)
-        for filename in os.listdir(IMAGES_DIR):
-            # Buscar por nome do mercado (case insensitive) e também por variações
-            mercado_variations = [
-                mercado_nome.lower(),
-                mercado_nome.title(),
-                mercado_nome.upper()
-            ]
-            
-            # Verificar se o arquivo pertence ao mercado
-            filename_lower = filename.lower()
-            is_mercado_file = any(var in filename_lower for var in mercado_variations)
-            
-            # Verificar extensões de imagem
-            is_image = filename.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp', '.gif'))
-            
-            if is_mercado_file and is_image:
-                image_path = os.path.join(IMAGES_DIR, filename)
-                try:
-                    print(f"Processando {filename}...")
-                    
-                    texto = self.extract_text(image_path)
-                    if texto and len(texto.strip()) > 10:  # Validar que há texto suficiente
-                        produtos = self.limpar_dados_mercado(texto, mercado_nome)
-                        print(f"  -> {len(produtos)} produtos extraídos de {filename}")
-                        produtos_todos.extend(produtos)
-                    else:
-                        print(f"  -> Nenhum texto extraído de {filename}")
-                except Exception as e:
-                    print(f"  -> Erro ao processar {filename}: {e}")
+        # Buscar por nome do mercado (case insensitive) e também por variações
+        mercado_variations = [
+            mercado_nome.lower(),
+            mercado_nome.title(),
+            mercado_nome.upper()
+        ]
+        arquivos_mercado = [
+            filename for filename in sorted(os.listdir(IMAGES_DIR))
+            if any(var in filename.lower() for var in mercado_variations)
+        ]
+        
+        # Encartes em PDF: camada de texto ou OCR página a página (as páginas
+        # rasterizadas desses PDFs são tratadas em processar_pdf)
+        prefixos_pdf = []
+        for filename in arquivos_mercado:
+            if not filename.lower().endswith('.pdf'):
+                continue
+            prefixos_pdf.append(filename[:-len('.pdf')] + '_page_')
+            try:
+                print(f"Processando {filename}...")
+                produtos_todos.extend(self.processar_pdf(os.path.join(IMAGES_DIR, filename), mercado_nome, somente_cache))
+            except Exception as e:
+                print(f"  -> Erro ao processar PDF {filename}: {e}")
+        
+        # Buscar imagens do mercado (screenshots, imagens de encarte e páginas avulsas)
+        imagens = [
+            (filename, os.path.join(IMAGES_DIR, filename)) for filename in arquivos_mercado
+            if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp', '.gif'))
+            and not filename.startswith(tuple(prefixos_pdf))
+        ]
+        # OCR em paralelo; resultados chegam na ordem dos nomes de arquivo
+        for filename, image_path, texto in self.ocr_imagens(imagens, mercado_nome, somente_cache=somente_cache):
+            try:
+                print(f"Processando {filename}...")
+                if texto and len(texto.strip()) > 10:  # Validar que há texto suficiente
+                    produtos = self.limpar_dados_mercado(texto, mercado_nome)
+                    print(f"  -> {len(produtos)} produtos extraídos de {filename}")
+                    produtos_todos.extend(produtos)
+                else:
+                    print(f"  -> Nenhum texto extraído de {filename}")
+            except Exception as e:
+                print(f"  -> Erro ao processar {filename}: {e}")
         
+        if not somente_cache:
+            removidas = self.encarte_store.podar_ocr()
+            if removidas:
+                print(f"Leituras OCR descartadas do store (limite de tamanho): {removidas}")
+        self.selecao_psm.salvar()
+        if OCR_CONFIG.get('psm_adaptativo'):
+            estatisticas = self.selecao_psm.estatisticas
+            print(f"Passadas de OCR: {estatisticas['tentativas']} em {estatisticas['imagens']} imagens | "
+                  f"com falha: {estatisticas['falhas']} | economizadas: {estatisticas['economizadas']}")
         print(f"Total de produtos processados para {mercado_nome}: {len(produtos_todos)}")
         return produtos_todos
     
@@ -2,15 +2,17 @@
 OCR Processor Avançado - Lida com diferentes formatos e posições
 Usa múltiplas estratégias para extrair dados de layouts variados
 """
-import pytesseract
 from PIL import Image
 import re
 import pandas as pd
 from datetime import datetime
 import os
-from config import OCR_CONFIG, IMAGES_DIR
+from config import OCR_CONFIG, IMAGES_DIR, CACHE_DIR
 import cv2
 import numpy as np
+from motor_ocr import motor_ocr
+from selecao_psm import SelecaoPSM, ocr_psms
+from padroes_preco import PRECO_RS, QUANTIDADE_CARD, PRECOS_LAYOUT, QUANTIDADES_LAYOUT
 
 class OCRProcessorAvancado:
     def __init__(self):
@@ -27,6 +29,8 @@ class OCRProcessorAvancado:
             'dog chow', 'whiskas', 'pedigree', 'royal canin', 'golden',
             'pipicat', 'wyda', 'duracell', 'rayovac'
         ]
+        # PSM que deu a melhor leitura em cada mercado (modo OCR_CONFIG['psm_adaptativo'])
+        self.selecao_psm = SelecaoPSM(os.path.join(CACHE_DIR, 'psm_mercados_avancado.json'))
     
     def detectar_regioes_produto(self, image_path):
         """
@@ -62,9 +66,8 @@ class OCRProcessorAvancado:
         gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
         _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         
-        # OCR na região
-        custom_config = f'-l {OCR_CONFIG["lang"]} --psm 7'  # PSM 7 = linha única
-        text = pytesseract.image_to_string(thresh, config=custom_config)
+        # OCR na região (PSM 7 = linha única)
+        text = motor_ocr().texto(thresh, 7)
         return text.strip()
     
     def processar_layout_tabela(self, texto_extraido):
@@ -78,7 +81,7 @@ class OCRProcessorAvancado:
         # Detectar padrão de tabela (múltiplas colunas)
         for i, linha in enumerate(linhas):
             # Se linha tem múltiplos preços ou múltiplos produtos, pode ser tabela
-            precos = re.findall(r'R\$\s*(\d+)[,.](\d{2})', linha)
+            precos = PRECO_RS.findall(linha)
             if len(precos) > 1:
                 # Processar cada coluna
                 colunas = linha.split()  # Dividir por espaços
@@ -103,14 +106,14 @@ class OCRProcessorAvancado:
             
             # Buscar preço em qualquer linha do bloco
             for linha in linhas_bloco:
-                preco_match = re.search(r'R\$\s*(\d+)[,.](\d{2})', linha)
+                preco_match = PRECO_RS.search(linha)
                 if preco_match:
                     produto_info['preco'] = float(f"{preco_match.group(1)}.{preco_match.group(2)}")
                     break
             
             # Buscar quantidade em qualquer linha
             for linha in linhas_bloco:
-                qtd_match = re.search(r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac)', linha, re.IGNORECASE)
+                qtd_match = QUANTIDADE_CARD.search(linha)
                 if qtd_match:
                     produto_info['quantidade'] = f"{qtd_match.group(1)}{qtd_match.group(2).lower()}"
                     break
@@ -147,47 +150,26 @@ class OCRProcessorAvancado:
             
             produto_info = {}
             
-            # Múltiplos padrões de preço (diferentes posições)
-            preco_patterns = [
-                r'R\$\s*(\d+)[,.](\d{2})',  # R$ no início
-                r'(\d+)[,.](\d{2})\s*R\$',  # R$ no final
-                r'(\d+)[,.](\d{2})\s*reais',  # "reais" no final
-                r'preco[:\s]*(\d+)[,.](\d{2})',  # "preço: XX,XX"
-                r'(\d+)[,.](\d{2})',  # Apenas número (último recurso)
-            ]
-            
-            preco_match = None
-            for pattern in preco_patterns:
-                preco_match = re.search(pattern, linha, re.IGNORECASE)
-                if preco_match:
-                    produto_info['preco'] = float(f"{preco_match.group(1)}.{preco_match.group(2)}")
-                    # Remover preço da linha
-                    linha = re.sub(pattern, '', linha, flags=re.IGNORECASE).strip()
-                    break
-            
-            if not preco_match:
+            # Padrões de preço e de quantidade em ordem de prioridade (padroes_preco),
+            # cada lista resolvida em uma varredura da linha
+            preco = PRECOS_LAYOUT.buscar(linha)
+            if preco is None:
                 continue
+            produto_info['preco'] = float(f"{preco.grupos[0]}.{preco.grupos[1]}")
+            # Remover preço da linha
+            linha = PRECOS_LAYOUT.remover(preco, linha)
             
-            # Múltiplos padrões de quantidade (diferentes posições)
-            qtd_patterns = [
-                r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac|und|unid)',
-                r'(\d+(?:[,.]\d+)?)\s*(quilo|quilos|grama|gramas|litro|litros)',
-                r'(\d+)\s*x\s*(\d+)\s*(g|kg|ml|L)',  # Ex: 4 x 250ml
-            ]
-            
-            for pattern in qtd_patterns:
-                qtd_match = re.search(pattern, linha, re.IGNORECASE)
-                if qtd_match:
-                    if len(qtd_match.groups()) == 3:  # Formato 4 x 250ml
-                        num = int(qtd_match.group(1)) * int(qtd_match.group(2))
-                        unidade = qtd_match.group(3).lower()
-                        produto_info['quantidade'] = f"{num}{unidade}"
-                    else:
-                        num = qtd_match.group(1).replace(',', '.')
-                        unidade = qtd_match.group(2).lower()
-                        produto_info['quantidade'] = f"{num}{unidade}"
-                    linha = re.sub(pattern, '', linha, flags=re.IGNORECASE).strip()
-                    break
+            qtd = QUANTIDADES_LAYOUT.buscar(linha)
+            if qtd is not None:
+                if len(qtd.grupos) == 3:  # Formato 4 x 250ml
+                    num = int(qtd.grupos[0]) * int(qtd.grupos[1])
+                    unidade = qtd.grupos[2].lower()
+                    produto_info['quantidade'] = f"{num}{unidade}"
+                else:
+                    num = qtd.grupos[0].replace(',', '.')
+                    unidade = qtd.grupos[1].lower()
+                    produto_info['quantidade'] = f"{num}{unidade}"
+                linha = QUANTIDADES_LAYOUT.remover(qtd, linha)
             
             # Buscar marca (pode estar em qualquer posição)
             marca_encontrada = None
@@ -211,7 +193,7 @@ class OCRProcessorAvancado:
         todos_produtos = []
         
         # Estratégia 1: OCR completo da imagem
-        texto_completo = self.extract_text_completo(image_path)
+        texto_completo = self.extract_text_completo(image_path, mercado_nome)
         
         # Tentar diferentes estratégias de parsing
         estrategias = [
@@ -248,18 +230,27 @@ class OCRProcessorAvancado:
         
         return todos_produtos
     
-    def extract_text_completo(self, image_path):
+    def extract_text_completo(self, image_path, mercado_nome=None):
         """Extrai todo o texto da imagem"""
         img = cv2.imread(image_path)
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         
-        # Múltiplas configurações PSM para diferentes layouts
+        # Múltiplas configurações PSM para diferentes layouts: 6=bloco, 11=sparse, 12=sparse com OSD
+        psms = [6, 11, 12]
+        if OCR_CONFIG.get('psm_adaptativo'):
+            limiar = None if self.selecao_psm.explorar(mercado_nome) else OCR_CONFIG.get('limiar_psm', 0.6)
+            texto, relatorio = ocr_psms(thresh, self.selecao_psm.ordem(mercado_nome, psms), limiar=limiar)
+            self.selecao_psm.registrar(mercado_nome, relatorio)
+            # Sem lote aqui (uma imagem por chamada): grava as vitórias a cada imagem
+            self.selecao_psm.salvar()
+            return texto
+        
         textos = []
-        for psm in [6, 11, 12]:  # 6=bloco, 11=sparse, 12=sparse com OSD
+        motor = motor_ocr()
+        for psm in psms:
             try:
-                custom_config = f'-l {OCR_CONFIG["lang"]} --psm {psm}'
-                texto = pytesseract.image_to_string(thresh, config=custom_config)
+                texto = motor.texto(thresh, psm)
                 textos.append(texto)
             except:
                 pass
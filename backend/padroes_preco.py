@@ -0,0 +1,179 @@
+"""
+Padrões de preço e quantidade pré-compilados, usados pelo scraper e pelo OCR
+Os parsers de encarte tentavam listas de padrões em sequência (até 11 de
+preço e 10 de quantidade por linha), cada um com re.search(padrao_str, ...),
+que passa pelo cache de compilação do módulo re a cada chamada. Aqui cada
+lista é compilada uma vez (LeitorPrioridade) e ler_linha devolve preço,
+quantidade e unidade de uma linha em uma chamada
+"""
+import re
+from collections import namedtuple
+
+# Preço com ou sem "R$": grupos 1-2 (com R$) ou 3-4 (sem R$)
+PRECO = re.compile(r'R\$\s*(\d+)[,.](\d{2})|(\d+)[,.](\d{2})')
+# Qualquer valor com centavos (contagens de debug e "tem preço?")
+PRECO_SIMPLES = re.compile(r'\d+[,.]\d{2}')
+PRECO_OU_RS = re.compile(r'R\$\s*\d+[,.]\d{2}|\d+[,.]\d{2}')
+# Palavra que é só um preço / só um número / texto que é só preço e números
+PRECO_ISOLADO = re.compile(r'^\d+[,.]\d{2}$')
+NUMERO_ISOLADO = re.compile(r'^\d+$')
+SO_NUMEROS = re.compile(r'^[0-9,.\s]+$')
+SO_PRECO = re.compile(r'^[R$0-9,.\s]+$')
+
+# Quantidade no nome do produto ("5kg", "1,5 L", "12 un")
+QUANTIDADE = re.compile(r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac|und)', re.IGNORECASE)
+
+# Guanabara: preço antes do nome ("13,95 Arroz Branco Ouro Nobre 5Kg")
+_LETRA = 'A-Za-zÁÉÍÓÚÂÊÔÃÕÇáéíóúâêôãõç'
+PRECO_NOME_GUANABARA = re.compile(
+    rf'(\d+[,.]\d{{2}})\s+([{_LETRA}][{_LETRA}0-9\s]{{3,60}}?)(?=\s*\d+[,.]\d{{2}}|\s*cada|</|<|$)',
+    re.MULTILINE | re.DOTALL
+)
+PRECO_NOME_SIMPLES = re.compile(rf'(\d+[,.]\d{{2}})\s+([{_LETRA}][{_LETRA}0-9\s]{{3,50}})', re.MULTILINE)
+CADA_FINAL = re.compile(r'\s+cada\s*$', re.IGNORECASE)
+
+ESPACOS = re.compile(r'\s+')
+TAG_HTML = re.compile(r'<[^>]+>')
+
+
+def valor_preco(match):
+    """Preço em float de um match de PRECO"""
+    if match.group(1):
+        return float(f"{match.group(1)}.{match.group(2)}")
+    return float(f"{match.group(3)}.{match.group(4)}")
+
+
+# Resultado de LeitorPrioridade.buscar: índice do padrão na lista, seus grupos e posição
+Ocorrencia = namedtuple('Ocorrencia', ['indice', 'grupos', 'inicio', 'fim'])
+
+_DIGITO = re.compile(r'\d')
+
+
+class LeitorPrioridade:
+    """
+    Lista de padrões tentados em ordem: vence o primeiro que casa em algum
+    lugar do texto, na sua posição mais à esquerda (o mesmo que
+    `for p in padroes: re.search(p, texto)`). Todos os padrões exigem um
+    dígito, então texto sem dígitos é descartado sem tentar nenhum.
+    Juntar a lista em uma única alternância (mesmo dentro de um lookahead,
+    para manter a prioridade) mediu cerca de 2x mais lento que os padrões
+    em sequência: o re do CPython testa cada alternativa em cada posição
+    """
+
+    def __init__(self, padroes, flags=0):
+        self.padroes = [re.compile(p, flags) for p in padroes]
+
+    def buscar(self, texto):
+        """Ocorrencia do primeiro padrão (na ordem da lista) que casa em `texto`, ou None"""
+        if not _DIGITO.search(texto):
+            return None
+        for indice, padrao in enumerate(self.padroes):
+            m = padrao.search(texto)
+            if m:
+                return Ocorrencia(indice, m.groups(), m.start(), m.end())
+        return None
+
+    def remover(self, ocorrencia, texto):
+        """`texto` sem todas as ocorrências do padrão que venceu (como re.sub(padrao, '', texto))"""
+        return self.padroes[ocorrencia.indice].sub('', texto).strip()
+
+
+# OCRProcessor.limpar_dados_mercado: padrões de preço, do mais ao menos específico
+PRECOS_ENCARTE = LeitorPrioridade([
+    r'R\$\s*(\d+)[,.](\d{2})',  # R$ 12,99 / R$12,99
+    r'(\d+)[,.](\d{2})\s*R\$',  # 12,99 R$
+    r'(\d+)[,.](\d{2})\s*reais',  # 12,99 reais
+    r'preco[:\s]*(\d+)[,.](\d{2})',  # preco: 12,99
+    r'preço[:\s]*(\d+)[,.](\d{2})',  # preço: 12,99
+    r'por\s*R\$\s*(\d+)[,.](\d{2})',  # por R$ 12,99
+    r'apenas\s*R\$\s*(\d+)[,.](\d{2})',  # apenas R$ 12,99
+    r'(\d+)[,.](\d{2})',  # 12,99 (sem R$, último recurso)
+    r'R\$\s*(\d+)',  # R$ 12 (sem centavos)
+    r'(\d+)\s*reais'  # 12 reais
+], re.IGNORECASE)
+
+# Tudo que parece preço é retirado da linha antes de buscar quantidade, marca e nome
+PRECOS_REMOVIDOS = re.compile(r'R\$\s*\d+[,.]\d{2}|\d+[,.]\d{2}\s*R\$|\d+[,.]\d{2}', re.IGNORECASE)
+
+QUANTIDADES_ENCARTE = LeitorPrioridade([
+    r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac|und|unid|unidade|und\.|un\.)',
+    r'(\d+(?:[,.]\d+)?)\s*(quilo|quilos|grama|gramas|litro|litros|mililitro|mililitros)',
+    r'(\d+)\s*x\s*(\d+)\s*(g|kg|ml|L)',  # 4 x 250ml
+    r'(\d+)\s*unidades',  # 4 unidades
+    r'(\d+)\s*un\.',  # 4 un.
+    r'pacote\s*(\d+)\s*(g|kg|ml|L)',  # pacote 500g
+    r'(\d+)\s*ml',  # 250ml (sem espaço)
+    r'(\d+)\s*kg',  # 5kg (sem espaço)
+    r'(\d+)\s*g',  # 500g (sem espaço)
+    r'(\d+)\s*L',  # 1L (sem espaço)
+], re.IGNORECASE)
+
+# Continuação de produto na linha seguinte do encarte
+CONTINUACAO_PRECO = re.compile(r'R\$\s*\d+|(\d+)[,.]\d{2}', re.IGNORECASE)
+CONTINUACAO_QTD = re.compile(r'(\d+)\s*(kg|g|L|ml|un)', re.IGNORECASE)
+
+_UNIDADES = {
+    'quilo': 'kg', 'quilos': 'kg',
+    'grama': 'g', 'gramas': 'g',
+    'litro': 'L', 'litros': 'L',
+    'mililitro': 'ml', 'mililitros': 'ml',
+    'un': 'un', 'und': 'un', 'unid': 'un', 'unidade': 'un', 'pct': 'un', 'pac': 'un', 'und.': 'un', 'un.': 'un',
+}
+
+# Resultado de ler_linha: preço, quantidade ("5kg"), valor e unidade dela, e o resto da linha
+LeituraLinha = namedtuple('LeituraLinha', ['preco', 'quantidade', 'valor', 'unidade', 'resto'])
+
+
+def ler_linha(linha):
+    """
+    Preço, quantidade e unidade de uma linha de encarte em uma chamada
+    Mesma leitura dos laços de padrões de OCRProcessor.limpar_dados_mercado;
+    a quantidade é buscada na linha sem os preços, como antes. Retorna None
+    se a linha não tem preço positivo
+    """
+    ocorrencia = PRECOS_ENCARTE.buscar(linha)
+    if ocorrencia is None:
+        return None
+    if len(ocorrencia.grupos) >= 2:
+        preco = float(f"{ocorrencia.grupos[0]}.{ocorrencia.grupos[1]}")
+    else:
+        preco = float(ocorrencia.grupos[0])
+    if preco <= 0:
+        return None
+
+    resto = PRECOS_REMOVIDOS.sub('', linha).strip()
+    quantidade = valor = unidade = None
+    ocorrencia = QUANTIDADES_ENCARTE.buscar(resto)
+    if ocorrencia is not None:
+        grupos = ocorrencia.grupos
+        if len(grupos) == 3:  # Formato 4 x 250ml
+            valor = int(float(grupos[0].replace(',', '.')) * float(grupos[1].replace(',', '.')))
+            unidade = grupos[2].lower()
+            quantidade = f"{valor}{unidade}"
+        else:
+            valor = grupos[0].replace(',', '.')
+            unidade = grupos[1].lower() if len(grupos) >= 2 else 'un'
+            unidade = _UNIDADES.get(unidade, unidade)
+            quantidade = f"{valor}{unidade}"
+        resto = QUANTIDADES_ENCARTE.remover(ocorrencia, resto)
+    return LeituraLinha(preco, quantidade, valor, unidade, resto)
+
+
+# OCRProcessorAvancado.processar_layout_linha
+PRECOS_LAYOUT = LeitorPrioridade([
+    r'R\$\s*(\d+)[,.](\d{2})',  # R$ no início
+    r'(\d+)[,.](\d{2})\s*R\$',  # R$ no final
+    r'(\d+)[,.](\d{2})\s*reais',  # "reais" no final
+    r'preco[:\s]*(\d+)[,.](\d{2})',  # "preço: XX,XX"
+    r'(\d+)[,.](\d{2})',  # Apenas número (último recurso)
+], re.IGNORECASE)
+
+QUANTIDADES_LAYOUT = LeitorPrioridade([
+    r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac|und|unid)',
+    r'(\d+(?:[,.]\d+)?)\s*(quilo|quilos|grama|gramas|litro|litros)',
+    r'(\d+)\s*x\s*(\d+)\s*(g|kg|ml|L)',  # Ex: 4 x 250ml
+], re.IGNORECASE)
+
+# OCRProcessorAvancado.processar_layout_card / processar_layout_tabela
+PRECO_RS = re.compile(r'R\$\s*(\d+)[,.](\d{2})')
+QUANTIDADE_CARD = re.compile(r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac)', re.IGNORECASE)
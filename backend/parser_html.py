@@ -0,0 +1,259 @@
+"""
+Backends de parse HTML para a extração de produtos
+As estratégias de extração usam apenas a interface de DocumentoHTML, então
+rodam com qualquer backend:
+  - 'html.parser': BeautifulSoup com o parser em Python puro (sempre disponível)
+  - 'lxml':        BeautifulSoup com o parser em C do lxml
+  - 'selectolax':  motor Lexbor (C) do selectolax, sem árvore do BeautifulSoup
+O backend vem de SCRAPING_CONFIG['parser_html']; se não estiver instalado, cai
+para 'html.parser'. DocumentoNavegador não parseia HTML: recebe do próprio
+navegador uma árvore reduzida da página (documento_do_navegador)
+"""
+import re
+from abc import ABC, abstractmethod
+from bs4 import BeautifulSoup
+from bs4.element import Tag, NavigableString, CData
+import json
+from config import SCRAPING_CONFIG
+from varredura_dom import TAGS_PRODUTO, CLASSES_PRODUTO
+
+try:
+    import lxml  # noqa: F401 (só verifica se o parser do BeautifulSoup está disponível)
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Elementos cujo conteúdo não é texto visível
+TAGS_SEM_TEXTO = ['script', 'style', 'template']
+
+
+class DocumentoHTML(ABC):
+    """Interface usada pelas estratégias de extração"""
+    backend = None
+
+    @abstractmethod
+    def texto(self):
+        """Texto visível da página, trechos separados por espaço (get_text(' ', strip=True))"""
+
+    @abstractmethod
+    def filhos(self, no):
+        """Filhos diretos de `no`: elementos ou str (texto visível)"""
+
+    @abstractmethod
+    def nome(self, no):
+        """Nome da tag de `no`, em minúsculas"""
+
+    @abstractmethod
+    def atributo(self, no, nome, padrao=''):
+        """Valor do atributo `nome` de `no` (listas, como class, juntadas por espaço), ou `padrao`"""
+
+    @abstractmethod
+    def texto_no(self, no):
+        """Texto do elemento com os trechos colados (get_text(strip=True))"""
+
+    @abstractmethod
+    def com_classe(self, padrao):
+        """Elementos cujo atributo class casa com a regex `padrao`"""
+
+
+class DocumentoBeautifulSoup(DocumentoHTML):
+    # Mesmos tipos de string que Tag.get_text() considera (sem comentários, scripts, estilos)
+    _TIPOS_TEXTO = (NavigableString, CData)
+
+    def __init__(self, html, backend='html.parser'):
+        self.backend = backend
+        self.raiz = BeautifulSoup(html, backend)
+
+    def texto(self):
+        return self.raiz.get_text(separator=' ', strip=True)
+
+    def filhos(self, no):
+        for filho in no.contents:
+            if isinstance(filho, Tag):
+                yield filho
+            elif type(filho) in self._TIPOS_TEXTO:
+                yield str(filho)
+
+    def nome(self, no):
+        return no.name
+
+    def atributo(self, no, nome, padrao=''):
+        valor = no.get(nome, padrao)
+        # class e outros atributos multivalorados vêm como lista
+        return ' '.join(valor) if isinstance(valor, list) else valor
+
+    def texto_no(self, no):
+        return no.get_text(strip=True)
+
+    def com_classe(self, padrao):
+        return self.raiz.find_all(attrs={'class': padrao})
+
+
+class DocumentoSelectolax(DocumentoHTML):
+    backend = 'selectolax'
+
+    def __init__(self, html):
+        self._parser = LexborHTMLParser(html)
+        self._parser.strip_tags(TAGS_SEM_TEXTO)
+        self.raiz = self._parser.root
+
+    def texto(self):
+        return self.raiz.text(separator=' ', strip=True) if self.raiz else ''
+
+    def filhos(self, no):
+        for filho in no.iter(include_text=True):
+            tag = filho.tag
+            if tag == '-text':
+                yield filho.text_content or ''
+            elif not tag.startswith(('-', '_', '!')):
+                yield filho
+
+    def nome(self, no):
+        return no.tag
+
+    def atributo(self, no, nome, padrao=''):
+        valor = no.attributes.get(nome)
+        return padrao if valor is None else valor
+
+    def texto_no(self, no):
+        return no.text(deep=True, separator='', strip=True)
+
+    def com_classe(self, padrao):
+        if isinstance(padrao, str):
+            padrao = re.compile(padrao)
+        return [no for no in self._parser.css('[class]') if padrao.search(no.attributes.get('class') or '')]
+
+
+# Atributos que as estratégias de extração leem de um elemento
+ATRIBUTOS_PRODUTO = ['class', 'alt', 'title', 'data-name', 'data-product-name']
+
+# Árvore reduzida da página montada no navegador: só elementos que podem ser
+# card de produto (tags ou classes de produto) e os trechos de texto visível,
+# já sem espaços nas pontas. Os demais elementos são achatados no ancestral
+# mantido, na mesma ordem, então o texto de cada elemento (e o da página) é o
+# mesmo que o parse do page_source daria. Nó: [tag, atributos, filhos]
+JS_ARVORE_PRODUTOS = """
+var tags = {};
+arguments[0].forEach(function (t) { tags[t] = true; });
+var classes = new RegExp(arguments[1].join('|'), 'i');
+var atributos = arguments[2];
+var ignorar = {script: true, style: true, template: true, noscript: true};
+function visitar(no, saida) {
+    for (var filho = no.firstChild; filho; filho = filho.nextSibling) {
+        if (filho.nodeType === 3 || filho.nodeType === 4) {
+            var texto = filho.data.trim();
+            if (texto) { saida.push(texto); }
+        } else if (filho.nodeType === 1) {
+            var tag = filho.tagName.toLowerCase();
+            if (ignorar[tag]) { continue; }
+            var classe = filho.getAttribute('class') || '';
+            if (tags[tag] || (classe && classes.test(classe))) {
+                var attrs = {};
+                for (var i = 0; i < atributos.length; i++) {
+                    var valor = filho.getAttribute(atributos[i]);
+                    if (valor !== null) { attrs[atributos[i]] = valor; }
+                }
+                var filhos = [];
+                visitar(filho, filhos);
+                saida.push([tag, attrs, filhos]);
+            } else {
+                visitar(filho, saida);
+            }
+        }
+    }
+}
+var raiz = [];
+visitar(document, raiz);
+return JSON.stringify(['[document]', {}, raiz]);
+"""
+
+
+class DocumentoNavegador(DocumentoHTML):
+    """Árvore reduzida de JS_ARVORE_PRODUTOS (sem page_source nem parse de HTML)"""
+    backend = 'navegador'
+
+    def __init__(self, arvore):
+        self.raiz = arvore
+
+    @staticmethod
+    def _trechos(no):
+        """Trechos de texto da subárvore, em ordem"""
+        pilha = [iter(no[2])]
+        while pilha:
+            filho = next(pilha[-1], None)
+            if filho is None:
+                pilha.pop()
+            elif isinstance(filho, str):
+                yield filho
+            else:
+                pilha.append(iter(filho[2]))
+
+    def texto(self):
+        return ' '.join(self._trechos(self.raiz))
+
+    def filhos(self, no):
+        return no[2]
+
+    def nome(self, no):
+        return no[0]
+
+    def atributo(self, no, nome, padrao=''):
+        return no[1].get(nome, padrao)
+
+    def texto_no(self, no):
+        return ''.join(self._trechos(no))
+
+    def com_classe(self, padrao):
+        if isinstance(padrao, str):
+            padrao = re.compile(padrao)
+        encontrados = []
+        pilha = [self.raiz]
+        while pilha:
+            no = pilha.pop()
+            if padrao.search(no[1].get('class', '')):
+                encontrados.append(no)
+            # Filhos em ordem reversa: a pilha devolve os elementos na ordem do documento
+            pilha.extend(filho for filho in reversed(no[2]) if not isinstance(filho, str))
+        return encontrados
+
+
+def documento_do_navegador(driver):
+    """DocumentoNavegador da página aberta em `driver` (um execute_script; JSON compacto)"""
+    arvore = driver.execute_script(JS_ARVORE_PRODUTOS, sorted(TAGS_PRODUTO), CLASSES_PRODUTO, ATRIBUTOS_PRODUTO)
+    documento = DocumentoNavegador(json.loads(arvore))
+    # JSON original (tamanho transferido e snapshot para reextração offline)
+    documento.arvore_json = arvore
+    return documento
+
+
+def backends_disponiveis():
+    """Backends instalados, do mais rápido para o mais lento"""
+    disponiveis = []
+    if LexborHTMLParser:
+        disponiveis.append('selectolax')
+    if lxml:
+        disponiveis.append('lxml')
+    disponiveis.append('html.parser')
+    return disponiveis
+
+
+_avisados = set()
+
+
+def criar_documento(html, backend=None):
+    """Parseia `html` com o backend pedido (ou o de SCRAPING_CONFIG['parser_html'])"""
+    backend = backend or SCRAPING_CONFIG.get('parser_html', 'html.parser')
+    disponiveis = backends_disponiveis()
+    if backend not in disponiveis:
+        if backend not in _avisados:
+            _avisados.add(backend)
+            print(f"⚠ Parser HTML '{backend}' não disponível; usando 'html.parser'")
+        backend = 'html.parser'
+
+    if backend == 'selectolax':
+        return DocumentoSelectolax(html)
+    return DocumentoBeautifulSoup(html, backend)
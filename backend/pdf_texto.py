@@ -0,0 +1,75 @@
+"""
+Leitura da camada de texto de encartes em PDF
+Muitos encartes são PDFs vetoriais com texto real: as palavras e suas
+coordenadas saem direto do PyMuPDF em milissegundos, sem rasterizar nem OCR.
+Só as páginas sem texto utilizável seguem para rasterização + OCR
+"""
+import re
+import fitz  # PyMuPDF
+from config import OCR_CONFIG
+
+
+def palavras_para_texto(palavras):
+    """
+    Reconstrói o texto da página a partir das palavras do PyMuPDF
+    (x0, y0, x1, y1, palavra, bloco, linha, n): uma linha por linha do PDF
+    e uma linha em branco entre blocos (como os cards do encarte)
+    """
+    linhas = {}
+    for x0, y0, x1, y1, palavra, bloco, linha, _ in palavras:
+        chave = (bloco, linha)
+        if chave not in linhas:
+            linhas[chave] = {'y': y0, 'x': x0, 'palavras': []}
+        linhas[chave]['palavras'].append((x0, palavra))
+
+    blocos = {}
+    for (bloco, _), dados in linhas.items():
+        dados['palavras'].sort()
+        texto_linha = ' '.join(p for _, p in dados['palavras'])
+        blocos.setdefault(bloco, []).append((dados['y'], dados['x'], texto_linha))
+
+    # Blocos na ordem de leitura: de cima para baixo, da esquerda para a direita
+    ordem = sorted(blocos.items(), key=lambda item: (min(l[0] for l in item[1]), min(l[1] for l in item[1])))
+    return '\n\n'.join('\n'.join(l[2] for l in sorted(linhas_bloco)) for _, linhas_bloco in ordem)
+
+
+def texto_utilizavel(texto, min_caracteres=None):
+    """Página tem texto real (e não só lixo de fontes sem mapa Unicode)"""
+    if min_caracteres is None:
+        min_caracteres = OCR_CONFIG.get('pdf_min_caracteres', 50)
+    alfanumericos = len(re.findall(r'\w', texto))
+    if alfanumericos < min_caracteres:
+        return False
+    # Fontes sem ToUnicode costumam virar U+FFFD ou caracteres de uso privado
+    invalidos = len(re.findall(r'[\ufffd\ue000-\uf8ff]', texto))
+    return invalidos < alfanumericos * 0.1
+
+
+def extrair_paginas_texto(pdf_path, min_caracteres=None):
+    """Lê palavras e coordenadas de cada página; marca quais têm texto utilizável"""
+    paginas = []
+    doc = fitz.open(pdf_path)
+    try:
+        for numero, page in enumerate(doc, 1):
+            palavras = page.get_text('words')
+            texto = palavras_para_texto(palavras)
+            paginas.append({
+                'pagina': numero,
+                'palavras': palavras,
+                'texto': texto,
+                'tem_texto': texto_utilizavel(texto, min_caracteres)
+            })
+    finally:
+        doc.close()
+    return paginas
+
+
+def paginas_com_texto(pdf_path):
+    """Números (1-based) das páginas que dispensam OCR"""
+    if not OCR_CONFIG.get('usar_texto_pdf', True):
+        return set()
+    try:
+        return {p['pagina'] for p in extrair_paginas_texto(pdf_path) if p['tem_texto']}
+    except Exception as e:
+        print(f"Erro ao ler camada de texto de {pdf_path}: {e}")
+        return set()
@@ -0,0 +1,69 @@
+"""
+Rasterização de PDFs página a página
+Renderiza as páginas sob demanda (gerador), opcionalmente em um pool de
+processos, e entrega cada imagem assim que fica pronta: o pico de memória é
+uma página por worker, não o documento inteiro
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+import fitz  # PyMuPDF
+try:
+    from pdf2image import convert_from_path
+except ImportError:
+    convert_from_path = None
+from config import OCR_CONFIG
+
+
+def dpi_mercado(mercado=None):
+    """DPI de rasterização do mercado (OCR_CONFIG['dpi_mercados'] sobrescreve 'dpi')"""
+    dpi_padrao = OCR_CONFIG.get('dpi', 300)
+    if not mercado:
+        return dpi_padrao
+    return OCR_CONFIG.get('dpi_mercados', {}).get(mercado.lower(), dpi_padrao)
+
+
+def renderizar_pagina(pdf_path, numero, base_saida, dpi):
+    """Renderiza uma página (1-based) e salva em disco; retorna (numero, caminho)"""
+    # Tentar com pdf2image primeiro (apenas a página pedida fica em memória)
+    if convert_from_path:
+        try:
+            image = convert_from_path(pdf_path, dpi=dpi, first_page=numero, last_page=numero)[0]
+            image_path = f"{base_saida}_page_{numero}.jpg"
+            image.save(image_path, 'JPEG')
+            image.close()
+            return numero, image_path
+        except Exception as e:
+            print(f"Erro ao converter página {numero} com pdf2image: {e}")
+
+    # PyMuPDF como alternativa
+    with fitz.open(pdf_path) as doc:
+        pix = doc[numero - 1].get_pixmap(dpi=dpi)
+        image_path = f"{base_saida}_page_{numero}.png"
+        pix.save(image_path)
+    return numero, image_path
+
+
+def _renderizar_tarefa(args):
+    return renderizar_pagina(*args)
+
+
+def renderizar_paginas(pdf_path, paginas, base_saida, dpi=None, workers=None):
+    """
+    Gerador de (numero, caminho) na ordem de `paginas`. Com workers > 1 as
+    páginas são renderizadas em processos separados; cada resultado é entregue
+    assim que a página (e as anteriores) estão prontas
+    """
+    dpi = dpi or OCR_CONFIG.get('dpi', 300)
+    if workers is None:
+        workers = OCR_CONFIG.get('workers_rasterizacao', 1)
+    workers = max(1, min(workers, len(paginas), os.cpu_count() or 1))
+
+    tarefas = [(pdf_path, numero, base_saida, dpi) for numero in paginas]
+    if workers == 1:
+        for tarefa in tarefas:
+            yield _renderizar_tarefa(tarefa)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for resultado in executor.map(_renderizar_tarefa, tarefas):
+            yield resultado
@@ -0,0 +1,165 @@
+"""
+Produtos a partir das respostas JSON (XHR/fetch) da página
+Muitas grades de produtos são preenchidas por endpoints JSON. Com o log de
+performance do Chrome (goog:loggingPrefs) os eventos Network.responseReceived
+dizem quais respostas eram JSON, e o corpo sai via CDP (Network.getResponseBody)
+enquanto a página ainda está aberta. Listas de objetos com nome + preço viram
+produtos no mesmo formato da extração por HTML, sem heurísticas de texto
+"""
+import base64
+import json
+from padroes_preco import PRECO, QUANTIDADE, valor_preco
+
+# Chaves usadas pelas lojas para o nome e o preço de um produto (comparadas em minúsculas)
+CHAVES_NOME = ('nome', 'name', 'productname', 'product_name', 'descricao', 'description', 'title', 'titulo')
+CHAVES_PRECO = ('preco_oferta', 'precooferta', 'preco_promocional', 'saleprice', 'sellingprice', 'bestprice',
+                'spotprice', 'price', 'preco', 'valor', 'preco_venda', 'precovenda')
+# Objetos onde o preço costuma estar aninhado (ex.: VTEX items[].sellers[].commertialOffer.Price)
+PROFUNDIDADE_PRECO = 4
+MAX_CORPO = 20 * 1024 * 1024
+
+
+def descartar_eventos(driver):
+    """Esvazia o log de performance (eventos da página anterior do mesmo driver)"""
+    try:
+        driver.get_log('performance')
+    except Exception:
+        pass
+
+
+def respostas_json(driver):
+    """(url, dados) de cada resposta JSON registrada desde a última leitura do log"""
+    try:
+        entradas = driver.get_log('performance')
+    except Exception:
+        return []
+
+    respostas = []
+    vistos = set()
+    for entrada in entradas:
+        try:
+            mensagem = json.loads(entrada['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        if mensagem.get('method') != 'Network.responseReceived':
+            continue
+        params = mensagem.get('params', {})
+        resposta = params.get('response', {})
+        if 'json' not in resposta.get('mimeType', '').lower() or params.get('requestId') in vistos:
+            continue
+        vistos.add(params.get('requestId'))
+        try:
+            corpo = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+        except Exception:
+            # Corpo já descartado pelo Chrome (redirecionamento, resposta vazia, página trocada)
+            continue
+        texto = corpo.get('body', '')
+        if len(texto) > MAX_CORPO:
+            continue
+        try:
+            if corpo.get('base64Encoded'):
+                texto = base64.b64decode(texto).decode('utf-8')
+            respostas.append((resposta.get('url', ''), json.loads(texto)))
+        except (ValueError, UnicodeDecodeError):
+            continue
+    return respostas
+
+
+def _valor(obj, chaves):
+    """Primeiro valor não vazio de `chaves` em um dict (chaves comparadas em minúsculas)"""
+    minusculas = {str(k).lower(): v for k, v in obj.items()}
+    for chave in chaves:
+        valor = minusculas.get(chave)
+        if valor not in (None, '', [], {}):
+            return valor
+    return None
+
+
+def _numero_preco(valor):
+    """Preço em float a partir de número ou texto ("R$ 13,95", "13.95"), ou None"""
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    if isinstance(valor, str):
+        match = PRECO.search(valor)
+        if match:
+            return valor_preco(match)
+        try:
+            return float(valor.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _preco(obj, profundidade=PROFUNDIDADE_PRECO):
+    """Preço do produto: chave direta ou dentro de objetos/listas aninhados"""
+    preco = _numero_preco(_valor(obj, CHAVES_PRECO))
+    if preco is not None or profundidade == 0:
+        return preco
+    for valor in obj.values():
+        filhos = valor if isinstance(valor, list) else [valor]
+        for filho in filhos[:5]:
+            if isinstance(filho, dict):
+                preco = _preco(filho, profundidade - 1)
+                if preco is not None:
+                    return preco
+    return None
+
+
+def produto_de_objeto(obj, categoria_nome=None):
+    """Produto (formato de extrair_produtos_de_html, com '_key') de um objeto JSON, ou None"""
+    nome = _valor(obj, CHAVES_NOME)
+    if not isinstance(nome, str):
+        return None
+    nome = ' '.join(nome.split())
+    if len(nome) < 2 or len(nome) > 200:
+        return None
+    preco = _preco(obj)
+    if preco is None or preco < 0.01 or preco > 10000:
+        return None
+    qtd_match = QUANTIDADE.search(nome)
+    quantidade = qtd_match.group(0) if qtd_match else 'un'
+    return {
+        '_key': f"{nome.lower()}_{preco}_{quantidade}",
+        'nome': nome,
+        'preco': preco,
+        'quantidade': quantidade,
+        'categoria': categoria_nome,
+        'texto_completo': f"{nome} {preco:.2f}"[:200]
+    }
+
+
+def _listas_de_objetos(dados):
+    """Todas as listas de dicts dentro do JSON (a grade de produtos é uma delas)"""
+    pilha = [dados]
+    while pilha:
+        atual = pilha.pop()
+        if isinstance(atual, dict):
+            pilha.extend(atual.values())
+        elif isinstance(atual, list):
+            if atual and any(isinstance(item, dict) for item in atual):
+                yield atual
+            pilha.extend(atual)
+
+
+def produtos_de_json(dados, categoria_nome=None, min_produtos=3):
+    """
+    Produtos das listas do JSON em que a maioria dos objetos tem nome + preço
+    (listas menores que `min_produtos` são ignoradas: menus, banners, filtros)
+    """
+    produtos = []
+    chaves = set()
+    for lista in _listas_de_objetos(dados):
+        objetos = [item for item in lista if isinstance(item, dict)]
+        if len(objetos) < min_produtos:
+            continue
+        candidatos = [produto_de_objeto(obj, categoria_nome) for obj in objetos]
+        validos = [p for p in candidatos if p]
+        if len(validos) < min_produtos or len(validos) * 2 < len(objetos):
+            continue
+        for produto in validos:
+            if produto['_key'] not in chaves:
+                chaves.add(produto['_key'])
+                produtos.append(produto)
+    return produtos
@@ -20,9 +20,13 @@ def atualizar_dados():
     
     # Processar com OCR
     todos_produtos = []
-    for mercado in ['guanabara', 'mundial', 'supermarket', 'prezunic']:
-        produtos = ocr.processar_imagens_mercado(mercado.title())
-        todos_produtos.extend(produtos)
+    try:
+        for mercado in ['guanabara', 'mundial', 'supermarket', 'prezunic']:
+            produtos = ocr.processar_imagens_mercado(mercado.title())
+            todos_produtos.extend(produtos)
+    finally:
+        # Não manter os processos de OCR ociosos em memória até a próxima execução
+        ocr.fechar()
     
     # Salvar dados
     if todos_produtos:
@@ -1,53 +1,108 @@
 import requests
-from bs4 import BeautifulSoup
 import time
 import os
 import re
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+import glob
+import shutil
+import threading
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from config import MERCADOS, SCRAPING_CONFIG, IMAGES_DIR
+from config import MERCADOS, SCRAPING_CONFIG, OCR_CONFIG, IMAGES_DIR
+from driver_pool import DriverPool, criar_driver, aplicar_perfil
+from esperas import EsperaPagina, RegistroEsperas, LimitadorHost
+from modo_busca import MemoriaModoBusca, ESTATICO, NAVEGADOR
+from cache_http import CacheHTTP
+from encarte_store import EncarteStore
+from pdf_texto import paginas_com_texto
+from rasterizador import renderizar_paginas, dpi_mercado
+from parser_html import criar_documento, documento_do_navegador, DocumentoNavegador
+from varredura_dom import varrer_elementos, CLASSES_PRODUTO
+from texto_html import TextoMapeado
+from arquivo_snapshots import ArquivoSnapshots, HTML, ARVORE, JSON
+from impressoes import ImpressoesPaginas, impressao_blocos
+from respostas_json import descartar_eventos, respostas_json, produtos_de_json
+from padroes_preco import (
+    PRECO, PRECO_SIMPLES, PRECO_OU_RS, PRECO_ISOLADO, NUMERO_ISOLADO, SO_NUMEROS, SO_PRECO,
+    QUANTIDADE, PRECO_NOME_GUANABARA, PRECO_NOME_SIMPLES, CADA_FINAL, ESPACOS, TAG_HTML, valor_preco
+)
 import json
 from datetime import datetime
-try:
-    from pdf2image import convert_from_path
-except ImportError:
-    convert_from_path = None
+from concurrent.futures import ThreadPoolExecutor
 import fitz  # PyMuPDF
 
 class MercadoScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        # Uma requests.Session por thread (mercados e categorias rodam em paralelo;
+        # a Session não é thread-safe: cookies e pool de conexões são compartilhados)
+        self._local = threading.local()
+        # Tempo de parede (segundos) do último scrape_all, por mercado
+        self.tempos_mercado = {}
+        # Drivers Chrome reutilizados entre mercados/páginas
+        self.pool = DriverPool()
+        # Tempo esperado por prontidão vs. sleeps fixos substituídos
+        self.registro_esperas = RegistroEsperas()
+        # Intervalo mínimo entre requisições ao mesmo host (cortesia com o site)
+        self.limitador = LimitadorHost(SCRAPING_CONFIG.get('delay_between_requests', 0))
+        # Por URL: a página rende produtos sem JavaScript ou precisa do navegador
+        self.modo_busca = MemoriaModoBusca()
+        # Encartes baixados com requisições condicionais (ETag/Last-Modified)
+        self.cache_http = CacheHTTP(lambda: self.session)
+        # filename -> True se o conteúdo baixado mudou desde o último download
+        self.conteudo_alterado = {}
+        # Páginas renderizadas por SHA-256 do encarte
+        self.encarte_store = EncarteStore()
+        # Por URL: hash do texto da página e produtos extraídos (páginas inalteradas não são reextraídas)
+        self.impressoes = ImpressoesPaginas()
+        # Páginas baixadas (comprimidas, deduplicadas) para reextração offline
+        self.snapshots = ArquivoSnapshots()
+    
+    @property
+    def session(self):
+        """requests.Session desta thread, criada no primeiro uso"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            })
+            self._local.session = session
+        return session
     
     def setup_selenium(self):
-        """Configura o driver Selenium para sites com JavaScript"""
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        return driver
+        """Configura um driver Selenium avulso (fora do pool) para sites com JavaScript"""
+        return criar_driver()
+    
+    def abrir_pagina(self, driver, url, listagem=False):
+        """
+        Navega para a URL e contabiliza a página no pool (para reciclagem do driver).
+        Páginas de listagem (categorias) abrem com o perfil enxuto: sem imagens,
+        mídia, fontes e anúncios
+        """
+        self.limitador.aguardar(url)
+        aplicar_perfil(driver, listagem and SCRAPING_CONFIG.get('perfil_enxuto', True))
+        if SCRAPING_CONFIG.get('capturar_json', True):
+            descartar_eventos(driver)
+        driver.get(url)
+        self.pool.registrar_pagina(driver)
+    
+    def esperar(self, driver, mercado):
+        """Cria as esperas por prontidão da página com os limites do mercado"""
+        return EsperaPagina(driver, mercado, self.registro_esperas)
+    
+    def _copiar_do_cache(self, url, filename):
+        """Baixa via cache HTTP e copia para IMAGES_DIR só se o conteúdo mudou"""
+        resultado = self.cache_http.baixar(url)
+        filepath = os.path.join(IMAGES_DIR, filename)
+        if resultado.mudou or not os.path.exists(filepath):
+            shutil.copyfile(resultado.caminho, filepath)
+        self.conteudo_alterado[filename] = resultado.mudou
+        return filepath, resultado
     
     def download_image(self, url, filename):
         """Baixa uma imagem de uma URL"""
         try:
-            response = self.session.get(url, timeout=SCRAPING_CONFIG['timeout'])
-            response.raise_for_status()
-            
-            filepath = os.path.join(IMAGES_DIR, filename)
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
+            filepath, _ = self._copiar_do_cache(url, filename)
             return filepath
         except Exception as e:
             print(f"Erro ao baixar imagem {url}: {e}")
@@ -56,51 +111,61 @@ class MercadoScraper:
     def download_pdf(self, url, filename):
         """Baixa um PDF e converte para imagens"""
         try:
-            response = self.session.get(url, timeout=SCRAPING_CONFIG['timeout'])
-            response.raise_for_status()
+            pdf_path, resultado = self._copiar_do_cache(url, filename)
             
-            pdf_path = os.path.join(IMAGES_DIR, filename)
-            with open(pdf_path, 'wb') as f:
-                f.write(response.content)
+            # PDF inalterado e já convertido: reaproveitar as páginas existentes
+            base = filename[:-len('.pdf')] if filename.endswith('.pdf') else filename
+            paginas_existentes = sorted(
+                glob.glob(os.path.join(IMAGES_DIR, glob.escape(base) + '_page_*')),
+                key=lambda caminho: int(re.search(r'_page_(\d+)', caminho).group(1))
+            )
+            if not resultado.mudou and paginas_existentes:
+                print(f"Encarte {filename} inalterado, reaproveitando {len(paginas_existentes)} páginas")
+                return paginas_existentes
             
-            # Converter PDF para imagens
-            image_paths = []
+            # Mesmos bytes já renderizados antes (ex.: mesmo encarte com outra data no nome)
+            paginas_store = self.encarte_store.materializar_paginas(resultado.sha256, filename, IMAGES_DIR)
+            if paginas_store:
+                print(f"Encarte {filename} já conhecido ({resultado.sha256[:12]}), {len(paginas_store)} páginas do store")
+                return paginas_store
             
-            # Tentar com pdf2image primeiro
-            if convert_from_path:
-                try:
-                    images = convert_from_path(pdf_path, dpi=300)
-                    for i, image in enumerate(images):
-                        image_filename = filename.replace('.pdf', f'_page_{i+1}.jpg')
-                        image_path = os.path.join(IMAGES_DIR, image_filename)
-                        image.save(image_path, 'JPEG')
-                        image_paths.append(image_path)
-                        print(f"Página {i+1} convertida: {image_filename}")
-                    if image_paths:
-                        return image_paths
-                except Exception as e:
-                    print(f"Erro ao converter PDF com pdf2image: {e}")
+            if not OCR_CONFIG.get('rasterizar_no_download', True):
+                # OCRProcessor.processar_pdf renderiza sob demanda, página a página
+                return []
             
-            # Tentar com PyMuPDF como alternativa
-            try:
-                doc = fitz.open(pdf_path)
-                for page_num in range(len(doc)):
-                    page = doc[page_num]
-                    pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom para melhor qualidade
-                    image_filename = filename.replace('.pdf', f'_page_{page_num+1}.png')
-                    image_path = os.path.join(IMAGES_DIR, image_filename)
-                    pix.save(image_path)
-                    image_paths.append(image_path)
-                    print(f"Página {page_num+1} convertida com PyMuPDF: {image_filename}")
-                doc.close()
-                return image_paths if image_paths else None
-            except Exception as e2:
-                print(f"Erro ao converter PDF com PyMuPDF: {e2}")
-                return None
+            image_paths = self.converter_pdf(pdf_path, filename)
+            if image_paths:
+                self.encarte_store.guardar_paginas(resultado.sha256, image_paths)
+            return image_paths
         except Exception as e:
             print(f"Erro ao baixar PDF {url}: {e}")
             return None
     
+    def converter_pdf(self, pdf_path, filename):
+        """Converte em imagens as páginas do PDF que não têm camada de texto utilizável"""
+        image_paths = []
+        
+        # Páginas com texto real são lidas direto do PDF pelo OCRProcessor (sem OCR)
+        with fitz.open(pdf_path) as doc:
+            total_paginas = len(doc)
+        com_texto = paginas_com_texto(pdf_path)
+        paginas = [n for n in range(1, total_paginas + 1) if n not in com_texto]
+        if com_texto:
+            print(f"{len(com_texto)} de {total_paginas} páginas de {filename} com camada de texto (sem rasterizar)")
+        if not paginas:
+            return image_paths
+        
+        # Renderização página a página (pool de processos): uma página em memória por worker
+        mercado = filename.split('_', 1)[0]
+        base_saida = os.path.join(IMAGES_DIR, filename[:-len('.pdf')] if filename.endswith('.pdf') else filename)
+        try:
+            for numero, image_path in renderizar_paginas(pdf_path, paginas, base_saida, dpi=dpi_mercado(mercado)):
+                image_paths.append(image_path)
+                print(f"Página {numero} convertida: {os.path.basename(image_path)}")
+        except Exception as e:
+            print(f"Erro ao converter PDF {filename}: {e}")
+        return image_paths if image_paths else None
+    
     def encontrar_encarte_url(self, driver, mercado):
         """Encontra a URL do encarte (PDF ou imagem) na página"""
         encarte_urls = []
@@ -184,44 +249,109 @@ class MercadoScraper:
         return encarte_urls
     
     def extrair_produtos_html(self, driver, mercado, categoria_nome=None):
-        """Extrai produtos usando BeautifulSoup - ABORDAGEM SIMPLES COMO CAPTURA DE NOTÍCIAS"""
-        produtos = []
+        """Extrai produtos da página aberta no navegador (após carregar o conteúdo dinâmico)"""
         try:
-            # Aguardar carregamento completo e scroll para carregar conteúdo dinâmico
-            time.sleep(3)
+            # Aguardar produtos estabilizarem e rolar até o scrollHeight parar de crescer
+            espera = self.esperar(driver, mercado)
+            espera.aguardar_produtos_estaveis(etapa='extracao', fixo=3)
+            espera.rolar_ate_estabilizar(etapa='scroll_extracao', fixo=3)
+            
+            # Grade carregada por JSON: produtos direto das respostas, sem page_source
+            produtos_json = self.extrair_produtos_json(driver, mercado, categoria_nome)
+            if produtos_json is not None:
+                return produtos_json
             
-            # Scroll para carregar conteúdo lazy loading
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
+            # Árvore reduzida montada no próprio navegador (um execute_script, sem page_source)
+            if SCRAPING_CONFIG.get('extracao_no_navegador', True):
+                try:
+                    documento = documento_do_navegador(driver)
+                    print(f"  Árvore reduzida do navegador: {len(documento.arvore_json)} caracteres")
+                    produtos = self.extrair_produtos_de_html(None, mercado, categoria_nome, documento=documento,
+                                                             url=driver.current_url, origem='arvore')
+                    if produtos:
+                        return produtos
+                    print("  Árvore reduzida não rendeu produtos, usando page_source")
+                except Exception as e:
+                    print(f"  ⚠ Extração no navegador falhou ({e}), usando page_source")
             
             # Obter HTML completo da página (após scroll)
             html_content = driver.page_source
-            
-            # Debug: salvar HTML para análise (apenas primeira categoria para não encher disco)
-            if categoria_nome and 'Açougue' in categoria_nome:
-                debug_file = os.path.join(IMAGES_DIR, f"debug_html_{categoria_nome.replace(' ', '_')}.html")
+            url = driver.current_url
+        except Exception as e:
+            print(f"  ✗ Erro ao obter HTML da página: {e}")
+            return []
+        return self.extrair_produtos_de_html(html_content, mercado, categoria_nome, url=url, origem='page_source')
+    
+    def extrair_produtos_json(self, driver, mercado=None, categoria_nome=None):
+        """Produtos das respostas JSON da página aberta; None se não renderam o mínimo (usar o HTML)"""
+        if not SCRAPING_CONFIG.get('capturar_json', True):
+            return None
+        inicio = time.perf_counter()
+        respostas = respostas_json(driver)
+        produtos = self._produtos_de_respostas(respostas, categoria_nome)
+        
+        minimo = SCRAPING_CONFIG.get('min_produtos_json', 5)
+        if len(produtos) < minimo:
+            if respostas:
+                print(f"    {len(respostas)} respostas JSON renderam {len(produtos)} produtos (< {minimo}), usando o HTML")
+            return None
+        # Snapshot das respostas usadas (a página não passa por extrair_produtos_de_html)
+        if SCRAPING_CONFIG.get('arquivar_snapshots', True):
+            try:
+                conteudo = json.dumps([{'url': url, 'dados': dados} for url, dados in respostas], ensure_ascii=False)
+                self.snapshots.guardar(mercado, categoria_nome, driver.current_url, conteudo, JSON)
+            except (OSError, TypeError, ValueError) as e:
+                print(f"  ⚠ Erro ao arquivar snapshot: {e}")
+        print(f"    ✓ JSON da página: {len(produtos)} produtos de {len(respostas)} respostas em {time.perf_counter() - inicio:.2f}s")
+        return produtos
+    
+    def _produtos_de_respostas(self, respostas, categoria_nome=None):
+        """Produtos (sem duplicatas) de [(url, dados)] de respostas JSON"""
+        produtos = []
+        chaves = set()
+        for url, dados in respostas:
+            for produto in produtos_de_json(dados, categoria_nome):
+                if produto['_key'] not in chaves:
+                    chaves.add(produto['_key'])
+                    produtos.append({k: v for k, v in produto.items() if k != '_key'})
+        return produtos
+    
+    def extrair_produtos_de_html(self, html_content, mercado, categoria_nome=None, documento=None, url=None,
+                                 origem=None):
+        """
+        Extrai produtos de um HTML (parser em parser_html) - ABORDAGEM SIMPLES COMO CAPTURA DE NOTÍCIAS.
+        Com `documento` já pronto (DocumentoNavegador), html_content pode ser None. Com `url`,
+        a página vai para o arquivo de snapshots e uma página com os mesmos blocos preço + nome
+        que na última execução pelo mesmo caminho (`origem`: 'estatico', 'arvore' ou
+        'page_source') devolve os produtos já extraídos. O documento é parseado mesmo
+        assim (os blocos saem do texto dele); só as estratégias de extração são puladas
+        """
+        produtos = []
+        try:
+            # Snapshot da página baixada (reextração offline: reextrair_snapshots)
+            if url and SCRAPING_CONFIG.get('arquivar_snapshots', True):
                 try:
-                    with open(debug_file, 'w', encoding='utf-8') as f:
-                        f.write(html_content)
-                    print(f"  HTML salvo para debug: {debug_file}")
-                except:
-                    pass
+                    if html_content is not None:
+                        self.snapshots.guardar(mercado, categoria_nome, url, html_content, HTML)
+                    elif getattr(documento, 'arvore_json', None):
+                        self.snapshots.guardar(mercado, categoria_nome, url, documento.arvore_json, ARVORE)
+                except OSError as e:
+                    print(f"  ⚠ Erro ao arquivar snapshot: {e}")
             
-            # Usar BeautifulSoup para parsear (como fazem com notícias)
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            print(f"  HTML carregado: {len(html_content)} caracteres")
-            
-            # Debug: contar padrões de preço no HTML bruto
-            precos_no_html = len(re.findall(r'R\$\s*\d+[,.]\d{2}|\d+[,.]\d{2}', html_content))
-            print(f"  Padrões de preço no HTML bruto: {precos_no_html}")
+            # Parsear com o backend configurado (SCRAPING_CONFIG['parser_html'])
+            if documento is None:
+                documento = criar_documento(html_content)
             
             # Debug: verificar se tem texto de produtos
-            texto_completo = soup.get_text()
+            texto_completo = documento.texto()
+            
+            if html_content is not None:
+                print(f"  HTML carregado: {len(html_content)} caracteres")
+                # Debug: contar padrões de preço no HTML bruto
+                precos_no_html = len(PRECO_OU_RS.findall(html_content))
+                print(f"  Padrões de preço no HTML bruto: {precos_no_html}")
             tem_arroz = 'arroz' in texto_completo.lower()
-            tem_preco = bool(re.search(r'\d+[,.]\d{2}', texto_completo))
+            tem_preco = bool(PRECO_SIMPLES.search(texto_completo))
             print(f"  Contém 'arroz': {tem_arroz}")
             print(f"  Contém padrão de preço: {tem_preco}")
             
@@ -229,24 +359,21 @@ class MercadoScraper:
             # Padrão GUANABARA: "13,95 Arroz Branco Ouro Nobre 5Kg" (preço SEM R$ seguido de nome)
             print("  Estratégia 0: Buscando padrões no texto limpo (sem tags HTML)...")
             
-            # Obter texto limpo do BeautifulSoup (sem tags HTML)
-            texto_limpo = soup.get_text(separator=' ', strip=True)
+            # Obter texto limpo do documento (sem tags HTML)
+            texto_limpo = texto_completo
             print(f"  Texto limpo: {len(texto_limpo)} caracteres")
             
             # Padrão específico para Guanabara: número seguido de vírgula/ponto e 2 dígitos, seguido de texto (nome)
-            # Exemplo: "13,95 Arroz Branco..." ou "18,95 Arroz Combrasil..."
-            # CORRIGIDO: padrão que funciona (testado com HTML real)
-            padrao_guanabara = r'(\d+[,.]\d{2})\s+([A-Za-zÁÉÍÓÚÂÊÔÃÕÇáéíóúâêôãõç][A-Za-zÁÉÍÓÚÂÊÔÃÕÇáéíóúâêôãõç0-9\s]{3,60}?)(?=\s*\d+[,.]\d{2}|\s*cada|</|<|$)'
+            # Exemplo: "13,95 Arroz Branco..." ou "18,95 Arroz Combrasil..." (PRECO_NOME_GUANABARA em padroes_preco)
             
             # Buscar no texto limpo (onde funciona melhor)
-            matches_guanabara = list(re.finditer(padrao_guanabara, texto_limpo, re.MULTILINE | re.DOTALL))
+            matches_guanabara = list(PRECO_NOME_GUANABARA.finditer(texto_limpo))
             print(f"  Padrões Guanabara encontrados: {len(matches_guanabara)}")
             
             # Se não encontrou, tentar padrão mais simples
             if len(matches_guanabara) < 3:
                 print("  Tentando padrão mais simples...")
-                padrao_simples = r'(\d+[,.]\d{2})\s+([A-Za-zÁÉÍÓÚÂÊÔÃÕÇáéíóúâêôãõç][A-Za-zÁÉÍÓÚÂÊÔÃÕÇáéíóúâêôãõç0-9\s]{3,50})'
-                matches_guanabara = list(re.finditer(padrao_simples, texto_limpo, re.MULTILINE))
+                matches_guanabara = list(PRECO_NOME_SIMPLES.finditer(texto_limpo))
                 print(f"  Padrão simples encontrou: {len(matches_guanabara)}")
             
             # Debug: mostrar primeiros matches encontrados
@@ -255,7 +382,20 @@ class MercadoScraper:
                 for i, m in enumerate(matches_guanabara[:3], 1):
                     print(f"    {i}. Preço: {m.group(1)}, Nome: {m.group(2)[:50]}")
             
-            produtos_do_texto = produtos_de_elementos.copy()  # Começar com produtos de elementos
+            # Scraping incremental: mesmos blocos preço + nome que na última execução
+            # (pelo mesmo caminho de busca), mesmos produtos
+            impressao = None
+            if url and SCRAPING_CONFIG.get('scraping_incremental', True):
+                impressao = impressao_blocos(m.group(0) for m in matches_guanabara)
+                if impressao:
+                    anteriores = self.impressoes.produtos_se_igual(url, impressao, origem)
+                    if anteriores is not None:
+                        print(f"  ✓ Produtos inalterados desde a última execução: {len(anteriores)} reaproveitados")
+                        return anteriores
+            
+            produtos_do_texto = []
+            # Índices por chave para deduplicar em O(1) (antes: lista recriada a cada candidato)
+            chaves_texto = set()
             
             # Processar padrão específico Guanabara
             for match in matches_guanabara:
@@ -268,25 +408,26 @@ class MercadoScraper:
                     
                     nome = match.group(2).strip()
                     # Limpar nome - remover tags HTML que podem ter escapado
-                    nome = re.sub(r'<[^>]+>', '', nome)
+                    nome = TAG_HTML.sub('', nome)
                     # Remover quebras de linha e espaços múltiplos
-                    nome = re.sub(r'\s+', ' ', nome)
+                    nome = ESPACOS.sub(' ', nome)
                     # Remover espaços no início/fim
                     nome = nome.strip()
                     # Remover "cada" no final (ex: "Arroz Máximo 5Kg cada" -> "Arroz Máximo 5Kg")
-                    nome = re.sub(r'\s+cada\s*$', '', nome, flags=re.IGNORECASE)
+                    nome = CADA_FINAL.sub('', nome)
                     nome = nome.strip()
                     
                     # Validar nome
                     if nome and len(nome) >= 3 and len(nome) <= 200:
                         # Pular se for só número ou caracteres especiais
-                        if not re.match(r'^[0-9,.\s]+$', nome):
+                        if not SO_NUMEROS.match(nome):
                             # Extrair quantidade
-                            qtd_match = re.search(r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac|und)', nome, re.IGNORECASE)
+                            qtd_match = QUANTIDADE.search(nome)
                             quantidade = qtd_match.group(0) if qtd_match else 'un'
                             
                             produto_key = f"{nome.lower()}_{preco}_{quantidade}"
-                            if produto_key not in [p.get('_key', '') for p in produtos_do_texto]:
+                            if produto_key not in chaves_texto:
+                                chaves_texto.add(produto_key)
                                 produtos_do_texto.append({
                                     '_key': produto_key,
                                     'nome': nome,
@@ -299,194 +440,99 @@ class MercadoScraper:
                     continue
             
             # Processar padrões gerais (backup)
-            for match in re.finditer(r'R\$\s*(\d+)[,.](\d{2})|(\d+)[,.](\d{2})', html_content):
+            # Texto sem tags calculado uma vez; cada preço vira uma fatia (sem novo parse por match).
+            # Sem HTML (árvore do navegador) as janelas em torno do preço são medidas no texto
+            if html_content is not None:
+                texto_mapeado = TextoMapeado(html_content)
+            else:
+                texto_mapeado = TextoMapeado.de_texto(texto_completo)
+            texto_plano = texto_mapeado.texto
+            for match in PRECO.finditer(texto_plano):
                 try:
                     # Extrair preço
-                    if match.group(1):
-                        preco = float(f"{match.group(1)}.{match.group(2)}")
-                    else:
-                        preco = float(f"{match.group(3)}.{match.group(4)}")
+                    preco = valor_preco(match)
                     
                     if preco < 0.01 or preco > 10000:
                         continue
                     
                     # Pegar contexto ANTES e DEPOIS do preço (Guanabara tem preço ANTES do nome)
-                    inicio = max(0, match.start() - 50)  # Pouco antes (preço geralmente está no início)
-                    fim = min(len(html_content), match.end() + 300)  # Muito depois (nome vem depois)
-                    contexto = html_content[inicio:fim]
-                    
-                    # Parsear contexto com BeautifulSoup para extrair texto limpo
-                    contexto_soup = BeautifulSoup(contexto, 'html.parser')
-                    texto_limpo = contexto_soup.get_text(separator=' ', strip=True)
+                    # A janela continua medida em caracteres do HTML, como antes
+                    pos_html_inicio = texto_mapeado.posicao_html(match.start())
+                    pos_html_fim = texto_mapeado.posicao_html(match.end())
+                    inicio = texto_mapeado.posicao_texto(max(0, pos_html_inicio - 50))  # Pouco antes (preço geralmente está no início)
+                    fim = texto_mapeado.posicao_texto(min(texto_mapeado.tamanho_html, pos_html_fim + 300))  # Muito depois (nome vem depois)
+                    fim = max(fim, match.end())
+                    texto_limpo = texto_plano[inicio:fim].strip()
                     
                     # Padrão GUANABARA: "13,95 Arroz Branco Ouro Nobre 5Kg"
                     # Preço vem ANTES do nome
-                    preco_texto = match.group(0)
-                    pos_preco = texto_limpo.find(preco_texto)
+                    # Nome vem DEPOIS do preço (fatia do texto até o fim da janela)
+                    texto_depois_preco = texto_plano[match.end():fim].strip()
+                    
+                    # Limpar e extrair nome (até encontrar próximo número ou fim)
+                    # Remover palavras comuns que não são parte do nome
+                    palavras = texto_depois_preco.split()
+                    nome_palavras = []
                     
-                    if pos_preco >= 0:
-                        # Nome vem DEPOIS do preço
-                        texto_depois_preco = texto_limpo[pos_preco + len(preco_texto):].strip()
-                        
-                        # Limpar e extrair nome (até encontrar próximo número ou fim)
-                        # Remover palavras comuns que não são parte do nome
-                        palavras = texto_depois_preco.split()
-                        nome_palavras = []
-                        
-                        for palavra in palavras:
-                            palavra_limpa = palavra.strip('.,;:!?()[]{}')
-                            # Parar se encontrar outro preço ou número grande
-                            if re.match(r'^\d+[,.]\d{2}$', palavra_limpa):
-                                break
-                            # Parar se encontrar palavras de fim de lista
-                            if palavra_limpa.lower() in ['cada', 'unidade', 'un', 'kg', 'g', 'l', 'ml'] and len(nome_palavras) > 3:
-                                # Adicionar a palavra se for unidade (kg, g, etc)
-                                if palavra_limpa.lower() in ['kg', 'g', 'l', 'ml', 'un', 'pct', 'pac']:
-                                    nome_palavras.append(palavra_limpa)
-                                break
-                            # Adicionar palavra se não for só número
-                            if palavra_limpa and not re.match(r'^\d+$', palavra_limpa):
+                    for palavra in palavras:
+                        palavra_limpa = palavra.strip('.,;:!?()[]{}')
+                        # Parar se encontrar outro preço ou número grande
+                        if PRECO_ISOLADO.match(palavra_limpa):
+                            break
+                        # Parar se encontrar palavras de fim de lista
+                        if palavra_limpa.lower() in ['cada', 'unidade', 'un', 'kg', 'g', 'l', 'ml'] and len(nome_palavras) > 3:
+                            # Adicionar a palavra se for unidade (kg, g, etc)
+                            if palavra_limpa.lower() in ['kg', 'g', 'l', 'ml', 'un', 'pct', 'pac']:
                                 nome_palavras.append(palavra_limpa)
-                            # Limitar tamanho do nome
-                            if len(nome_palavras) >= 15:
-                                break
-                        
-                        nome = ' '.join(nome_palavras).strip()
-                        
-                        # Validar nome
-                        if nome and len(nome) >= 2 and len(nome) <= 200:
-                            if not re.match(r'^[R$0-9,.\s]+$', nome):
-                                # Extrair quantidade do nome
-                                qtd_match = re.search(r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac|und)', nome, re.IGNORECASE)
-                                quantidade = qtd_match.group(0) if qtd_match else 'un'
-                                
-                                produto_key = f"{nome.lower()}_{preco}_{quantidade}"
-                                if produto_key not in [p.get('_key', '') for p in produtos_do_texto]:
-                                    produtos_do_texto.append({
-                                        '_key': produto_key,
-                                        'nome': nome,
-                                        'preco': preco,
-                                        'quantidade': quantidade,
-                                        'categoria': categoria_nome,
-                                        'texto_completo': texto_limpo[:200]
-                                    })
+                            break
+                        # Adicionar palavra se não for só número
+                        if palavra_limpa and not NUMERO_ISOLADO.match(palavra_limpa):
+                            nome_palavras.append(palavra_limpa)
+                        # Limitar tamanho do nome
+                        if len(nome_palavras) >= 15:
+                            break
+                    
+                    nome = ' '.join(nome_palavras).strip()
+                    
+                    # Validar nome
+                    if nome and len(nome) >= 2 and len(nome) <= 200:
+                        if not SO_PRECO.match(nome):
+                            # Extrair quantidade do nome
+                            qtd_match = QUANTIDADE.search(nome)
+                            quantidade = qtd_match.group(0) if qtd_match else 'un'
+                            
+                            produto_key = f"{nome.lower()}_{preco}_{quantidade}"
+                            if produto_key not in chaves_texto:
+                                chaves_texto.add(produto_key)
+                                produtos_do_texto.append({
+                                    '_key': produto_key,
+                                    'nome': nome,
+                                    'preco': preco,
+                                    'quantidade': quantidade,
+                                    'categoria': categoria_nome,
+                                    'texto_completo': texto_limpo[:200]
+                                })
                 except Exception as e:
                     continue
             
             print(f"  ✓ {len(produtos_do_texto)} produtos encontrados por busca direta no HTML")
             
-            # ESTRATÉGIA 1: Buscar TODOS os elementos que podem conter produtos
-            todos_elementos = soup.find_all(['div', 'li', 'article', 'span', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'a', 'td', 'tr', 'section'])
-            
-            print(f"  Total de elementos encontrados: {len(todos_elementos)}")
-            
+            # ESTRATÉGIA 1: Menor elemento que contém nome + preço (uma única passada pela árvore)
             produtos_encontrados = []
+            chaves_encontrados = set()
             
-            for elem in todos_elementos:
-                try:
-                    texto = elem.get_text(strip=True)
-                    
-                    # Verificar se tem padrão de produto: texto + preço
-                    if not texto or len(texto) < 5 or len(texto) > 500:
-                        continue
-                    
-                    # Buscar preço no texto
-                    preco_match = re.search(r'R\$\s*(\d+)[,.](\d{2})|(\d+)[,.](\d{2})', texto)
-                    if not preco_match:
-                        continue
-                    
-                    # Extrair preço
-                    if preco_match.group(1):
-                        preco = float(f"{preco_match.group(1)}.{preco_match.group(2)}")
-                    else:
-                        preco = float(f"{preco_match.group(3)}.{preco_match.group(4)}")
-                    
-                    # Validar preço razoável
-                    if preco < 0.01 or preco > 10000:
-                        continue
-                    
-                    # GUANABARA: Preço pode vir ANTES ou DEPOIS do nome
-                    # Tentar ambas as direções
-                    texto_antes_preco = texto[:preco_match.start()].strip()
-                    texto_depois_preco = texto[preco_match.end():].strip()
-                    
-                    nome = ""
-                    
-                    # Estratégia 1: Nome DEPOIS do preço (padrão Guanabara: "13,95 Arroz...")
-                    if texto_depois_preco and len(texto_depois_preco) > 2:
-                        palavras = texto_depois_preco.split()
-                        nome_palavras = []
-                        for palavra in palavras[:15]:  # Limitar a 15 palavras
-                            palavra_limpa = palavra.strip('.,;:!?()[]{}')
-                            # Parar se encontrar outro preço
-                            if re.match(r'^\d+[,.]\d{2}$', palavra_limpa):
-                                break
-                            if palavra_limpa and not re.match(r'^\d+$', palavra_limpa):
-                                nome_palavras.append(palavra_limpa)
-                        nome = ' '.join(nome_palavras).strip()
-                    
-                    # Estratégia 2: Nome ANTES do preço (padrão comum: "Arroz... R$ 13,95")
-                    if not nome or len(nome) < 2:
-                        if texto_antes_preco and len(texto_antes_preco) > 2:
-                            linhas = [l.strip() for l in texto_antes_preco.split('\n') if l.strip()]
-                            if linhas:
-                                nome = max(linhas, key=len)
-                    
-                    # Estratégia 3: Tentar pegar texto do elemento pai
-                    if not nome or len(nome) < 2:
-                        try:
-                            if elem.parent:
-                                texto_pai = elem.parent.get_text(strip=True)
-                                # Buscar padrão: preço seguido de nome
-                                preco_pos = texto_pai.find(preco_match.group(0))
-                                if preco_pos >= 0:
-                                    texto_depois = texto_pai[preco_pos + len(preco_match.group(0)):].strip()
-                                    palavras = texto_depois.split()[:15]
-                                    nome_palavras = [p.strip('.,;:!?()[]{}') for p in palavras if p.strip('.,;:!?()[]{}') and not re.match(r'^\d+$', p.strip('.,;:!?()[]{}'))]
-                                    nome = ' '.join(nome_palavras).strip()
-                        except:
-                            pass
-                    
-                    # Limpar nome final
-                    nome = re.sub(r'\s+', ' ', nome).strip()
-                    
-                    # Se ainda não tem nome, tentar pegar do atributo alt, title, ou data-*
-                    if not nome or len(nome) < 2:
-                        for attr in ['alt', 'title', 'data-name', 'data-product-name']:
-                            try:
-                                attr_value = elem.get(attr, '')
-                                if attr_value and len(attr_value) > 2:
-                                    nome = attr_value.strip()
-                                    break
-                            except:
-                                continue
-                    
-                    # Validar nome
-                    if not nome or len(nome) < 2 or len(nome) > 200:
-                        continue
-                    
-                    # Pular se for só número ou preço
-                    if re.match(r'^[R$0-9,.\s]+$', nome):
-                        continue
-                    
-                    # Extrair quantidade do nome
-                    qtd_match = re.search(r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac|und)', nome, re.IGNORECASE)
-                    quantidade = qtd_match.group(0) if qtd_match else 'un'
-                    
-                    # Adicionar produto (evitar duplicatas)
-                    produto_key = f"{nome.lower()}_{preco}_{quantidade}"
-                    if produto_key not in [p.get('_key', '') for p in produtos_encontrados]:
-                        produtos_encontrados.append({
-                            '_key': produto_key,
-                            'nome': nome,
-                            'preco': preco,
-                            'quantidade': quantidade,
-                            'categoria': categoria_nome,
-                            'texto_completo': texto[:200]
-                        })
-                        
-                except Exception as e:
-                    continue
+            def avaliar_elemento(elem, texto):
+                produto = self._produto_de_elemento(documento, elem, texto, categoria_nome)
+                if not produto:
+                    return False
+                # Adicionar produto (evitar duplicatas)
+                if produto['_key'] not in chaves_encontrados:
+                    chaves_encontrados.add(produto['_key'])
+                    produtos_encontrados.append(produto)
+                return True
+            
+            total_elementos = varrer_elementos(documento, avaliar_elemento)
+            print(f"  Total de elementos avaliados: {total_elementos}")
             
             print(f"  ✓ {len(produtos_encontrados)} produtos únicos encontrados por padrão de texto")
             
@@ -501,6 +547,7 @@ class MercadoScraper:
                     produtos_finais[key] = p
             
             produtos_encontrados = list(produtos_finais.values())
+            chaves_finais = set(produtos_finais)
             print(f"  ✓ Total combinado (sem duplicatas): {len(produtos_encontrados)} produtos")
             
             # ESTRATÉGIA 2: Buscar em elementos com classes específicas (backup)
@@ -508,32 +555,27 @@ class MercadoScraper:
                 print("  Tentando busca por classes específicas...")
                 
                 # Buscar elementos com classes comuns de produto
-                classes_produto = ['produto', 'product', 'item', 'card', 'oferta', 'product-card']
-                
-                for classe in classes_produto:
-                    elementos = soup.find_all(attrs={'class': re.compile(classe, re.I)})
+                for classe in CLASSES_PRODUTO:
+                    elementos = documento.com_classe(re.compile(classe, re.I))
                     for elem in elementos:
                         try:
-                            texto = elem.get_text(strip=True)
+                            texto = documento.texto_no(elem)
                             if not texto or len(texto) < 5:
                                 continue
                             
                             # Buscar preço
-                            preco_match = re.search(r'R\$\s*(\d+)[,.](\d{2})|(\d+)[,.](\d{2})', texto)
+                            preco_match = PRECO.search(texto)
                             if not preco_match:
                                 continue
                             
-                            if preco_match.group(1):
-                                preco = float(f"{preco_match.group(1)}.{preco_match.group(2)}")
-                            else:
-                                preco = float(f"{preco_match.group(3)}.{preco_match.group(4)}")
+                            preco = valor_preco(preco_match)
                             
                             if preco < 0.01 or preco > 10000:
                                 continue
                             
                             # Extrair nome
                             texto_antes_preco = texto[:preco_match.start()].strip()
-                            nome = re.sub(r'\s+', ' ', texto_antes_preco).strip()
+                            nome = ESPACOS.sub(' ', texto_antes_preco).strip()
                             linhas = [l.strip() for l in nome.split('\n') if l.strip()]
                             if linhas:
                                 nome = linhas[0]
@@ -541,11 +583,12 @@ class MercadoScraper:
                             if not nome or len(nome) < 2:
                                 continue
                             
-                            qtd_match = re.search(r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac|und)', nome, re.IGNORECASE)
+                            qtd_match = QUANTIDADE.search(nome)
                             quantidade = qtd_match.group(0) if qtd_match else 'un'
                             
                             produto_key = f"{nome.lower()}_{preco}_{quantidade}"
-                            if produto_key not in [p.get('_key', '') for p in produtos_encontrados]:
+                            if produto_key not in chaves_finais:
+                                chaves_finais.add(produto_key)
                                 produtos_encontrados.append({
                                     '_key': produto_key,
                                     'nome': nome,
@@ -570,6 +613,8 @@ class MercadoScraper:
                 })
             
             print(f"  ✓ Total final: {len(produtos)} produtos extraídos")
+            if impressao and produtos:
+                self.impressoes.guardar(url, impressao, produtos, origem)
             
             # Debug: mostrar produtos encontrados
             if produtos:
@@ -598,17 +643,245 @@ class MercadoScraper:
         
         return produtos
     
+    def reextrair_snapshots(self, mercado=None, categoria=None, desde=None, ate=None):
+        """
+        Modo offline: roda a extração atual sobre as páginas do arquivo de snapshots,
+        sem navegador nem rede. Retorna [(captura, produtos)] em ordem cronológica.
+        Conteúdo repetido (mesmo SHA-256 e categoria) é extraído uma única vez
+        """
+        resultados = []
+        extraidos = {}
+        for entrada in self.snapshots.listar(mercado, categoria, desde, ate):
+            chave = (entrada['sha256'], entrada.get('mercado'), entrada.get('categoria'))
+            if chave not in extraidos:
+                conteudo = self.snapshots.ler(entrada)
+                if entrada.get('tipo') == JSON:
+                    respostas = [(r.get('url'), r.get('dados')) for r in json.loads(conteudo)]
+                    extraidos[chave] = self._produtos_de_respostas(respostas, entrada.get('categoria'))
+                elif entrada.get('tipo') == ARVORE:
+                    documento = DocumentoNavegador(json.loads(conteudo))
+                    extraidos[chave] = self.extrair_produtos_de_html(
+                        None, entrada.get('mercado'), entrada.get('categoria'), documento=documento
+                    )
+                else:
+                    extraidos[chave] = self.extrair_produtos_de_html(
+                        conteudo, entrada.get('mercado'), entrada.get('categoria')
+                    )
+            resultados.append((entrada, [dict(p) for p in extraidos[chave]]))
+        return resultados
+    
+    def _produto_de_elemento(self, documento, elem, texto, categoria_nome=None):
+        """Produto (com '_key') a partir do texto de um elemento, ou None se não tiver nome + preço"""
+        try:
+            # Verificar se tem padrão de produto: texto + preço
+            if not texto or len(texto) < 5 or len(texto) > 500:
+                return None
+            
+            # Buscar preço no texto
+            preco_match = PRECO.search(texto)
+            if not preco_match:
+                return None
+            
+            # Extrair preço
+            preco = valor_preco(preco_match)
+            
+            # Validar preço razoável
+            if preco < 0.01 or preco > 10000:
+                return None
+            
+            # GUANABARA: Preço pode vir ANTES ou DEPOIS do nome
+            # Tentar ambas as direções
+            texto_antes_preco = texto[:preco_match.start()].strip()
+            texto_depois_preco = texto[preco_match.end():].strip()
+            
+            nome = ""
+            
+            # Estratégia 1: Nome DEPOIS do preço (padrão Guanabara: "13,95 Arroz...")
+            if texto_depois_preco and len(texto_depois_preco) > 2:
+                palavras = texto_depois_preco.split()
+                nome_palavras = []
+                for palavra in palavras[:15]:  # Limitar a 15 palavras
+                    palavra_limpa = palavra.strip('.,;:!?()[]{}')
+                    # Parar se encontrar outro preço
+                    if PRECO_ISOLADO.match(palavra_limpa):
+                        break
+                    if palavra_limpa and not NUMERO_ISOLADO.match(palavra_limpa):
+                        nome_palavras.append(palavra_limpa)
+                nome = ' '.join(nome_palavras).strip()
+            
+            # Estratégia 2: Nome ANTES do preço (padrão comum: "Arroz... R$ 13,95")
+            if not nome or len(nome) < 2:
+                if texto_antes_preco and len(texto_antes_preco) > 2:
+                    linhas = [l.strip() for l in texto_antes_preco.split('\n') if l.strip()]
+                    if linhas:
+                        nome = max(linhas, key=len)
+            
+            # Elemento só com o preço: o nome está no elemento pai, que a varredura
+            # avalia em seguida com o texto completo
+            
+            # Limpar nome final
+            nome = ESPACOS.sub(' ', nome).strip()
+            
+            # Se ainda não tem nome, tentar pegar do atributo alt, title, ou data-*
+            if not nome or len(nome) < 2:
+                for attr in ['alt', 'title', 'data-name', 'data-product-name']:
+                    try:
+                        attr_value = documento.atributo(elem, attr)
+                        if attr_value and len(attr_value) > 2:
+                            nome = attr_value.strip()
+                            break
+                    except:
+                        continue
+            
+            # Validar nome
+            if not nome or len(nome) < 2 or len(nome) > 200:
+                return None
+            
+            # Pular se for só número ou preço
+            if SO_PRECO.match(nome):
+                return None
+            
+            # Extrair quantidade do nome
+            qtd_match = QUANTIDADE.search(nome)
+            quantidade = qtd_match.group(0) if qtd_match else 'un'
+            
+            return {
+                '_key': f"{nome.lower()}_{preco}_{quantidade}",
+                'nome': nome,
+                'preco': preco,
+                'quantidade': quantidade,
+                'categoria': categoria_nome,
+                'texto_completo': texto[:200]
+            }
+        except Exception as e:
+            return None
+    
+    def buscar_html_estatico(self, url):
+        """Baixa o HTML da página com um GET simples (sem executar JavaScript)"""
+        self.limitador.aguardar(url)
+        response = self.session.get(url, timeout=SCRAPING_CONFIG['timeout'])
+        response.raise_for_status()
+        # Sem charset no cabeçalho o requests assume ISO-8859-1 e estraga os acentos
+        if 'charset' not in response.headers.get('Content-Type', '').lower():
+            response.encoding = response.apparent_encoding
+        return response.text
+    
+    def tentar_estatico(self, mercado, url, categoria_nome=None):
+        """Tenta extrair os produtos sem navegador; retorna None se a página precisa de JavaScript"""
+        if not SCRAPING_CONFIG.get('busca_estatica', True):
+            return None
+        if self.modo_busca.modo(url) == NAVEGADOR:
+            return None
+        
+        inicio = time.perf_counter()
+        try:
+            html_content = self.buscar_html_estatico(url)
+        except Exception as e:
+            print(f"    ⚠ GET estático falhou para {url}: {e}")
+            return None
+        
+        produtos = self.extrair_produtos_de_html(html_content, mercado, categoria_nome, url=url, origem='estatico')
+        minimo = SCRAPING_CONFIG.get('min_produtos_estatico', 5)
+        if len(produtos) < minimo:
+            print(f"    HTML estático rendeu {len(produtos)} produtos (< {minimo}), usando navegador")
+            self.modo_busca.lembrar(url, NAVEGADOR, len(produtos))
+            return None
+        
+        self.modo_busca.lembrar(url, ESTATICO, len(produtos))
+        print(f"    ✓ HTML estático: {len(produtos)} produtos em {time.perf_counter() - inicio:.2f}s (sem navegador)")
+        return produtos
+    
+    def scrape_categoria(self, mercado, categoria):
+        """Scraping de uma página de categoria (HTML puro), pelo GET estático ou por um driver do pool"""
+        produtos_estaticos = self.tentar_estatico(mercado, categoria['url'], categoria['nome'])
+        if produtos_estaticos is not None:
+            return produtos_estaticos
+        
+        driver = None
+        try:
+            driver = self.pool.checkout()
+            print(f"\n  Processando categoria: {categoria['nome']}")
+            print(f"    Acessando: {categoria['url']}")
+            self.abrir_pagina(driver, categoria['url'], listagem=True)
+            espera = self.esperar(driver, mercado)
+            espera.aguardar_rede_ociosa(etapa='categoria', fixo=10)
+            
+            # Aguardar elementos carregarem
+            try:
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
+            except:
+                print(f"      ⚠ [{categoria['nome']}] Timeout aguardando body carregar")
+            
+            # Verificar se tem conteúdo
+            body_text = driver.find_element(By.TAG_NAME, "body").text
+            print(f"      [{categoria['nome']}] Título: {driver.title[:50]} | Texto no body: {len(body_text)} caracteres")
+            
+            if len(body_text) < 100:
+                print(f"      ⚠ [{categoria['nome']}] Página parece vazia ou não carregou corretamente")
+            
+            # Scroll múltiplo para carregar todos os produtos dinâmicos (lazy loading)
+            # até o scrollHeight parar de crescer (o loop fixo custava no mínimo 4s)
+            espera.rolar_ate_estabilizar(etapa='scroll_categoria', fixo=4)
+            
+            # Extrair produtos desta categoria (HTML puro)
+            produtos_categoria = self.extrair_produtos_html(driver, mercado, categoria['nome'])
+            
+            if produtos_categoria:
+                print(f"  ✓ {len(produtos_categoria)} produtos encontrados em {categoria['nome']}")
+                # Mostrar primeiros 3 produtos encontrados
+                for i, p in enumerate(produtos_categoria[:3], 1):
+                    print(f"    {i}. {p.get('nome', 'N/A')} - R$ {p.get('preco', 0):.2f}")
+            else:
+                print(f"  ⚠ Nenhum produto encontrado em {categoria['nome']}")
+                # Tentar capturar HTML da página para debug
+                try:
+                    page_source = driver.page_source
+                    texto_page = criar_documento(page_source).texto()
+                    tem_arroz = 'arroz' in texto_page.lower()
+                    tem_preco = bool(PRECO_SIMPLES.search(texto_page))
+                    print(f"    Debug - Tem 'arroz': {tem_arroz}, Tem preço: {tem_preco}")
+                    print(f"    Tamanho do texto: {len(texto_page)} caracteres")
+                except Exception as e:
+                    print(f"    Erro ao verificar página: {e}")
+            return produtos_categoria or []
+        except Exception as e:
+            print(f"  ✗ Erro ao processar categoria {categoria['nome']}: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
+        finally:
+            self.pool.checkin(driver)
+    
+    def scrape_categorias(self, mercado, categorias, max_workers=None):
+        """Processa as categorias em paralelo (drivers do pool) mantendo a ordem das categorias"""
+        workers = max_workers or SCRAPING_CONFIG.get('max_workers_categorias', 3)
+        workers = max(1, min(workers, len(categorias)))
+        print(f"\nProcessando {len(categorias)} categorias de {mercado} (HTML puro, {workers} workers)...")
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'{mercado}-categoria') as executor:
+            futuros = [executor.submit(self.scrape_categoria, mercado, categoria) for categoria in categorias]
+            # Juntar na ordem das categorias, independente da ordem de conclusão
+            resultados = [futuro.result() for futuro in futuros]
+        
+        produtos = []
+        for produtos_categoria in resultados:
+            produtos.extend(produtos_categoria)
+        print(f"  Total de {mercado} nas categorias: {len(produtos)} produtos")
+        return produtos
+    
     def scrape_guanabara(self):
         """Scraping do site Guanabara - MELHORADO para capturar encarte E categorias"""
         produtos = []
         driver = None
         try:
-            driver = self.setup_selenium()
+            driver = self.pool.checkout()
             
             # 1. PROCESSAR ENCARTE (método original)
             print("Processando encarte do Guanabara...")
-            driver.get(MERCADOS['guanabara']['url'])
-            time.sleep(8)  # Aguarda carregamento completo
+            self.abrir_pagina(driver, MERCADOS['guanabara']['url'])
+            self.esperar(driver, 'guanabara').aguardar_rede_ociosa(etapa='encarte', fixo=8)
             
             # Tentar encontrar e clicar no botão "Baixar encarte" para obter o PDF
             try:
@@ -679,101 +952,17 @@ class MercadoScraper:
                         filename = f"guanabara_{datetime.now().strftime('%Y%m%d')}.jpg"
                         self.download_image(url, filename)
             
-            # 2. PROCESSAR CATEGORIAS DE PRODUTOS (APENAS HTML - SEM OCR)
-            if 'categorias' in MERCADOS['guanabara']:
-                print(f"\nProcessando {len(MERCADOS['guanabara']['categorias'])} categorias do Guanabara (HTML puro)...")
-                for categoria in MERCADOS['guanabara']['categorias']:
-                    try:
-                        print(f"\n  Processando categoria: {categoria['nome']}")
-                        print(f"  URL: {categoria['url']}")
-                        
-                        print(f"    Acessando: {categoria['url']}")
-                        driver.get(categoria['url'])
-                        time.sleep(10)  # Aguardar carregamento completo
-                        
-                        # Aguardar elementos carregarem
-                        try:
-                            WebDriverWait(driver, 15).until(
-                                EC.presence_of_element_located((By.TAG_NAME, "body"))
-                            )
-                        except:
-                            print(f"      ⚠ Timeout aguardando body carregar")
-                        
-                        # Verificar se página carregou
-                        page_title = driver.title
-                        print(f"      Título da página: {page_title[:50]}")
-                        
-                        # Verificar se tem conteúdo
-                        body_text = driver.find_element(By.TAG_NAME, "body").text
-                        print(f"      Texto no body: {len(body_text)} caracteres")
-                        
-                        if len(body_text) < 100:
-                            print(f"      ⚠ Página parece vazia ou não carregou corretamente")
-                        
-                        # Scroll múltiplo para carregar todos os produtos dinâmicos (lazy loading)
-                        last_height = driver.execute_script("return document.body.scrollHeight")
-                        scroll_attempts = 0
-                        max_scrolls = 5
-                        
-                        while scroll_attempts < max_scrolls:
-                            # Scroll para baixo
-                            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                            time.sleep(2)
-                            
-                            # Scroll para cima um pouco
-                            driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.7);")
-                            time.sleep(1)
-                            
-                            # Verificar se há mais conteúdo
-                            new_height = driver.execute_script("return document.body.scrollHeight")
-                            if new_height == last_height:
-                                break
-                            last_height = new_height
-                            scroll_attempts += 1
-                        
-                        # Voltar ao topo
-                        driver.execute_script("window.scrollTo(0, 0);")
-                        time.sleep(1)
-                        
-                        # Extrair produtos desta categoria (HTML puro)
-                        produtos_categoria = self.extrair_produtos_html(driver, 'guanabara', categoria['nome'])
-                        print(f"  Retorno de extrair_produtos_html: {len(produtos_categoria) if produtos_categoria else 0} produtos")
-                        
-                        if produtos_categoria and len(produtos_categoria) > 0:
-                            print(f"  ✓ {len(produtos_categoria)} produtos encontrados em {categoria['nome']}")
-                            # Mostrar primeiros 3 produtos encontrados
-                            for i, p in enumerate(produtos_categoria[:3], 1):
-                                print(f"    {i}. {p.get('nome', 'N/A')} - R$ {p.get('preco', 0):.2f}")
-                            produtos.extend(produtos_categoria)
-                            print(f"  Total acumulado: {len(produtos)} produtos")
-                        else:
-                            print(f"  ⚠ Nenhum produto encontrado em {categoria['nome']}")
-                            # Tentar capturar HTML da página para debug
-                            try:
-                                page_source = driver.page_source
-                                texto_page = BeautifulSoup(page_source, 'html.parser').get_text()
-                                tem_arroz = 'arroz' in texto_page.lower()
-                                tem_preco = bool(re.search(r'\d+[,.]\d{2}', texto_page))
-                                print(f"    Debug - Tem 'arroz': {tem_arroz}, Tem preço: {tem_preco}")
-                                print(f"    Tamanho do texto: {len(texto_page)} caracteres")
-                            except Exception as e:
-                                print(f"    Erro ao verificar página: {e}")
-                    except Exception as e:
-                        print(f"  ✗ Erro ao processar categoria {categoria['nome']}: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        continue
-            
         except Exception as e:
             print(f"Erro ao fazer scraping do Guanabara: {e}")
             import traceback
             traceback.print_exc()
         finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+            # Devolver o driver antes de distribuir as categorias entre os workers do pool
+            self.pool.checkin(driver)
+        
+        # 2. PROCESSAR CATEGORIAS DE PRODUTOS (APENAS HTML - SEM OCR)
+        if 'categorias' in MERCADOS['guanabara']:
+            produtos.extend(self.scrape_categorias('guanabara', MERCADOS['guanabara']['categorias']))
         
         print(f"\n=== RESUMO SCRAPING GUANABARA ===")
         print(f"Total de produtos encontrados: {len(produtos)}")
@@ -789,10 +978,11 @@ class MercadoScraper:
     def scrape_mundial(self):
         """Scraping do site Mundial"""
         produtos = []
+        driver = None
         try:
-            driver = self.setup_selenium()
-            driver.get(MERCADOS['mundial']['url'])
-            time.sleep(5)
+            driver = self.pool.checkout()
+            self.abrir_pagina(driver, MERCADOS['mundial']['url'])
+            self.esperar(driver, 'mundial').aguardar_rede_ociosa(etapa='pagina', fixo=5)
             
             # Tentar extrair produtos diretamente do HTML primeiro
             produtos_html = self.extrair_produtos_html(driver, 'mundial')
@@ -809,20 +999,21 @@ class MercadoScraper:
                     if url.startswith('http'):
                         filename = f"mundial_{datetime.now().strftime('%Y%m%d')}.jpg"
                         self.download_image(url, filename)
-            
-            driver.quit()
         except Exception as e:
             print(f"Erro ao fazer scraping do Mundial: {e}")
+        finally:
+            self.pool.checkin(driver)
         
         return produtos
     
     def scrape_supermarket(self):
         """Scraping do site Supermarket"""
         produtos = []
+        driver = None
         try:
-            driver = self.setup_selenium()
-            driver.get(MERCADOS['supermarket']['url'])
-            time.sleep(5)
+            driver = self.pool.checkout()
+            self.abrir_pagina(driver, MERCADOS['supermarket']['url'])
+            self.esperar(driver, 'supermarket').aguardar_rede_ociosa(etapa='pagina', fixo=5)
             
             # Tentar extrair produtos diretamente do HTML primeiro
             produtos_html = self.extrair_produtos_html(driver, 'supermarket')
@@ -839,20 +1030,21 @@ class MercadoScraper:
                     if url.startswith('http'):
                         filename = f"supermarket_{datetime.now().strftime('%Y%m%d')}.jpg"
                         self.download_image(url, filename)
-            
-            driver.quit()
         except Exception as e:
             print(f"Erro ao fazer scraping do Supermarket: {e}")
+        finally:
+            self.pool.checkin(driver)
         
         return produtos
     
     def scrape_prezunic(self):
         """Scraping do site Prezunic"""
         produtos = []
+        driver = None
         try:
-            driver = self.setup_selenium()
-            driver.get(MERCADOS['prezunic']['url'])
-            time.sleep(5)
+            driver = self.pool.checkout()
+            self.abrir_pagina(driver, MERCADOS['prezunic']['url'])
+            self.esperar(driver, 'prezunic').aguardar_rede_ociosa(etapa='pagina', fixo=5)
             
             # Tentar extrair produtos diretamente do HTML primeiro
             produtos_html = self.extrair_produtos_html(driver, 'prezunic')
@@ -869,22 +1061,80 @@ class MercadoScraper:
                     if url.startswith('http'):
                         filename = f"prezunic_{datetime.now().strftime('%Y%m%d')}.jpg"
                         self.download_image(url, filename)
-            
-            driver.quit()
         except Exception as e:
             print(f"Erro ao fazer scraping do Prezunic: {e}")
+        finally:
+            self.pool.checkin(driver)
         
         return produtos
     
-    def scrape_all(self):
-        """Executa scraping de todos os mercados"""
-        print("Iniciando scraping de todos os mercados...")
-        resultados = {
-            'guanabara': self.scrape_guanabara(),
-            'mundial': self.scrape_mundial(),
-            'supermarket': self.scrape_supermarket(),
-            'prezunic': self.scrape_prezunic()
+    def _executar_mercado(self, mercado, funcao_scrape):
+        """Executa o scraping de um mercado medindo o tempo de parede; retorna (produtos, duração)"""
+        inicio = time.perf_counter()
+        try:
+            produtos = funcao_scrape()
+        except Exception as e:
+            print(f"Erro ao fazer scraping de {mercado}: {e}")
+            produtos = []
+        duracao = time.perf_counter() - inicio
+        print(f"[{mercado}] concluído em {duracao:.1f}s ({len(produtos or [])} produtos)")
+        return produtos or [], duracao
+    
+    def scrape_all(self, paralelo=None, max_workers=None):
+        """Executa scraping de todos os mercados (em paralelo, um navegador por worker)"""
+        if paralelo is None:
+            paralelo = SCRAPING_CONFIG.get('mercados_em_paralelo', True)
+        
+        tarefas = {
+            'guanabara': self.scrape_guanabara,
+            'mundial': self.scrape_mundial,
+            'supermarket': self.scrape_supermarket,
+            'prezunic': self.scrape_prezunic
         }
+        self.tempos_mercado = {}
+        self.registro_esperas.limpar()
+        self.impressoes.limpar_estatisticas()
+        if SCRAPING_CONFIG.get('arquivar_snapshots', True):
+            self.snapshots.podar()
+        inicio_total = time.perf_counter()
+        
+        try:
+            execucoes = self._executar_mercados(tarefas, paralelo, max_workers)
+        finally:
+            # Não manter Chrome ocioso em memória entre execuções agendadas
+            self.pool.fechar()
+        
+        duracao_total = time.perf_counter() - inicio_total
+        resultados = {mercado: produtos for mercado, (produtos, _) in execucoes.items()}
+        self.tempos_mercado = {mercado: duracao for mercado, (_, duracao) in execucoes.items()}
+        print(f"\n=== TEMPOS POR MERCADO ===")
+        for mercado in tarefas:
+            print(f"  {mercado}: {self.tempos_mercado.get(mercado, 0):.1f}s")
+        print(f"  Total (parede): {duracao_total:.1f}s")
+        print(f"  Drivers: {self.pool.estatisticas}")
+        impressoes = self.impressoes.estatisticas
+        print(f"  Categorias inalteradas (reaproveitadas): {impressoes['acertos']} | reextraídas: {impressoes['falhas']}")
+        self.registro_esperas.imprimir_resumo()
         return resultados
+    
+    def _executar_mercados(self, tarefas, paralelo, max_workers):
+        """Executa as tarefas de scraping em paralelo ou em sequência: mercado -> (produtos, duração)"""
+        if paralelo:
+            workers = max_workers or SCRAPING_CONFIG.get('max_workers_mercados', len(tarefas))
+            workers = max(1, min(workers, len(tarefas)))
+            print(f"Iniciando scraping de todos os mercados ({workers} workers em paralelo)...")
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mercado') as executor:
+                futuros = {
+                    mercado: executor.submit(self._executar_mercado, mercado, funcao)
+                    for mercado, funcao in tarefas.items()
+                }
+                # Manter a mesma ordem de chaves do modo sequencial
+                return {mercado: futuro.result() for mercado, futuro in futuros.items()}
+        
+        print("Iniciando scraping de todos os mercados...")
+        return {
+            mercado: self._executar_mercado(mercado, funcao)
+            for mercado, funcao in tarefas.items()
+        }
 
 
@@ -0,0 +1,92 @@
+"""
+Benchmark da extração de produtos (MercadoScraper.extrair_produtos_de_html)
+Usa HTML de categoria salvo (arquivos passados na linha de comando ou as
+últimas páginas HTML do arquivo de snapshots) replicado em tamanhos crescentes e mostra se o
+tempo de parse cresce linearmente com o tamanho da página
+
+Uso: python scripts/benchmark_extracao.py [pagina1.html pagina2.html ...]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contextlib
+import io
+import re
+import time
+from scraper import MercadoScraper
+from arquivo_snapshots import ArquivoSnapshots, HTML
+
+FATORES = [1, 2, 4, 8, 16]
+
+
+def html_sintetico(n_produtos=200):
+    """Página no formato das categorias do Guanabara (preço antes do nome)"""
+    marcas = ['Tio João', 'Camil', 'Italac', 'Sadia', 'Ypê', 'Nestlé', 'Piraquê', 'Seara']
+    tipos = ['Arroz Branco', 'Feijão Preto', 'Leite Integral', 'Linguiça Toscana', 'Detergente', 'Biscoito']
+    cards = []
+    for i in range(n_produtos):
+        cards.append(
+            f'<div class="item"><div class="price"><span>{5 + i % 40},{i % 100:02d}</span></div>'
+            f'<div class="name"><p>{tipos[i % len(tipos)]} {marcas[i % len(marcas)]} {1 + i % 5}kg</p></div></div>'
+        )
+    return f'<html><body><section class="produtos">{"".join(cards)}</section></body></html>'
+
+
+def paginas_salvas(arquivos):
+    """(nome, html) dos arquivos pedidos ou, sem arquivos, da última captura HTML de cada URL arquivada"""
+    if arquivos:
+        for arquivo in arquivos:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                yield os.path.basename(arquivo), f.read()
+        return
+    arquivo_snapshots = ArquivoSnapshots()
+    for entrada in arquivo_snapshots.ultimos(tipo=HTML):
+        yield f"{entrada['mercado']}/{entrada['categoria']}", arquivo_snapshots.ler(entrada)
+
+
+def replicar(html, fator):
+    """Repete o corpo da página `fator` vezes, deslocando os preços para gerar produtos distintos"""
+    match = re.search(r'<body[^>]*>(.*)</body>', html, re.DOTALL | re.IGNORECASE)
+    corpo = match.group(1) if match else html
+    copias = [
+        re.sub(r'(\d+),(\d{2})', lambda m, k=k: f"{int(m.group(1)) + k},{m.group(2)}", corpo)
+        for k in range(fator)
+    ]
+    return f'<html><body>{"".join(copias)}</body></html>'
+
+
+def medir(scraper, html, repeticoes=3):
+    melhor = None
+    produtos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            produtos = scraper.extrair_produtos_de_html(html, 'guanabara', 'Benchmark')
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, len(produtos)
+
+
+def benchmark(nome, html_base, scraper):
+    print(f"\n{nome}")
+    print(f"  {'fator':>5} {'tamanho KB':>11} {'produtos':>9} {'tempo s':>9} {'ms/KB':>8}")
+    ms_por_kb = []
+    for fator in FATORES:
+        html = replicar(html_base, fator)
+        tamanho_kb = len(html) / 1024
+        duracao, n_produtos = medir(scraper, html)
+        ms_por_kb.append(duracao * 1000 / tamanho_kb)
+        print(f"  {fator:>5} {tamanho_kb:>11.0f} {n_produtos:>9} {duracao:>9.3f} {ms_por_kb[-1]:>8.3f}")
+    # Crescimento linear: ms/KB aproximadamente constante entre o menor e o maior tamanho
+    print(f"  Razão ms/KB (maior/menor página): {ms_por_kb[-1] / ms_por_kb[0]:.2f} (≈1 indica escala linear)")
+
+
+if __name__ == '__main__':
+    paginas = list(paginas_salvas(sys.argv[1:]))
+    scraper = MercadoScraper()
+    if not paginas:
+        print("Nenhum HTML salvo encontrado; usando página sintética")
+        benchmark('sintético (200 produtos)', html_sintetico(), scraper)
+    for nome, html in paginas:
+        benchmark(nome, html, scraper)
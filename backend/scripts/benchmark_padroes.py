@@ -0,0 +1,115 @@
+"""
+Micro-benchmark da leitura de preço/quantidade por linha de encarte
+Compara os laços de padrões que OCRProcessor.limpar_dados_mercado fazia
+(re.search de cada padrão em sequência) com padroes_preco.ler_linha, e
+confere que as duas leituras dão o mesmo resultado em todas as linhas
+
+Uso: python scripts/benchmark_padroes.py [texto_ocr1.txt texto_ocr2.txt ...]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import re
+import time
+from padroes_preco import ler_linha
+
+PRECO_PATTERNS = [
+    r'R\$\s*(\d+)[,.](\d{2})', r'R\$\s*(\d+)[,.](\d{2})', r'(\d+)[,.](\d{2})\s*R\$',
+    r'(\d+)[,.](\d{2})\s*reais', r'preco[:\s]*(\d+)[,.](\d{2})', r'preço[:\s]*(\d+)[,.](\d{2})',
+    r'por\s*R\$\s*(\d+)[,.](\d{2})', r'apenas\s*R\$\s*(\d+)[,.](\d{2})', r'(\d+)[,.](\d{2})',
+    r'R\$\s*(\d+)', r'(\d+)\s*reais'
+]
+QTD_PATTERNS = [
+    r'(\d+(?:[,.]\d+)?)\s*(kg|g|L|l|ml|un|pct|pac|und|unid|unidade|und\.|un\.)',
+    r'(\d+(?:[,.]\d+)?)\s*(quilo|quilos|grama|gramas|litro|litros|mililitro|mililitros)',
+    r'(\d+)\s*x\s*(\d+)\s*(g|kg|ml|L)', r'(\d+)\s*unidades', r'(\d+)\s*un\.',
+    r'pacote\s*(\d+)\s*(g|kg|ml|L)', r'(\d+)\s*ml', r'(\d+)\s*kg', r'(\d+)\s*g', r'(\d+)\s*L',
+]
+UNIDADES = {'quilo': 'kg', 'quilos': 'kg', 'grama': 'g', 'gramas': 'g', 'litro': 'L', 'litros': 'L',
+            'mililitro': 'ml', 'mililitros': 'ml'}
+
+
+def ler_linha_laco(linha):
+    """Leitura antiga: um re.search por padrão até o primeiro que casa"""
+    preco = None
+    for pattern in PRECO_PATTERNS:
+        m = re.search(pattern, linha, re.IGNORECASE)
+        if m:
+            preco = float(f"{m.group(1)}.{m.group(2)}") if len(m.groups()) >= 2 else float(m.group(1))
+            break
+    if preco is None or preco <= 0:
+        return None
+    resto = re.sub(r'R\$\s*\d+[,.]\d{2}|\d+[,.]\d{2}\s*R\$|\d+[,.]\d{2}', '', linha, flags=re.IGNORECASE).strip()
+    quantidade = None
+    for pattern in QTD_PATTERNS:
+        m = re.search(pattern, resto, re.IGNORECASE)
+        if m:
+            if len(m.groups()) == 3:
+                quantidade = f"{int(float(m.group(1)) * float(m.group(2)))}{m.group(3).lower()}"
+            else:
+                unidade = m.group(2).lower() if len(m.groups()) >= 2 else 'un'
+                if unidade in ['un', 'und', 'unid', 'unidade', 'pct', 'pac', 'und.', 'un.']:
+                    unidade = 'un'
+                quantidade = f"{m.group(1).replace(',', '.')}{UNIDADES.get(unidade, unidade)}"
+            resto = re.sub(pattern, '', resto, flags=re.IGNORECASE).strip()
+            break
+    return preco, quantidade, resto
+
+
+def linhas_sinteticas(n=5000, semente=7):
+    """Linhas no estilo do texto OCR de encartes (com ruído e linhas sem preço)"""
+    aleatorio = random.Random(semente)
+    nomes = ['Arroz Tio João', 'Feijão Preto Camil', 'Leite Integral Italac', 'Detergente Ypê',
+             'Cerveja Brahma lata', 'Biscoito Piraquê', 'Linguiça Toscana Sadia', 'Açúcar União']
+    quantidades = ['5kg', '1 kg', '500g', '1L', '350 ml', '4 x 250ml', '12 unidades', 'pacote 200g', '2 litros', '']
+    precos = ['R$ {r},{c:02d}', '{r},{c:02d}', '{r},{c:02d} R$', 'por R$ {r},{c:02d}', 'preço: {r}.{c:02d}',
+              'R$ {r}', '{r} reais', 'APENAS R${r},{c:02d}']
+    linhas = []
+    for _ in range(n):
+        if aleatorio.random() < 0.2:
+            linhas.append(aleatorio.choice(['OFERTAS DA SEMANA', 'válido até 10/02', 'Loja 3 - Centro', '']))
+            continue
+        partes = [aleatorio.choice(nomes), aleatorio.choice(quantidades),
+                  aleatorio.choice(precos).format(r=aleatorio.randint(0, 99), c=aleatorio.randint(0, 99))]
+        aleatorio.shuffle(partes)
+        linhas.append(' '.join(p for p in partes if p))
+    return linhas
+
+
+def medir(funcao, linhas, repeticoes=5):
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for linha in linhas:
+            funcao(linha)
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor
+
+
+if __name__ == '__main__':
+    if sys.argv[1:]:
+        linhas = []
+        for arquivo in sys.argv[1:]:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                linhas.extend(l.strip() for l in f)
+    else:
+        print("Nenhum texto informado; usando linhas sintéticas")
+        linhas = linhas_sinteticas()
+
+    divergentes = 0
+    for linha in linhas:
+        nova = ler_linha(linha)
+        nova = nova and (nova.preco, nova.quantidade, nova.resto)
+        if nova != ler_linha_laco(linha):
+            divergentes += 1
+            if divergentes <= 5:
+                print(f"  Divergência: {linha!r}: {nova} != {ler_linha_laco(linha)}")
+    print(f"{len(linhas)} linhas, {divergentes} leituras divergentes")
+
+    tempo_laco = medir(ler_linha_laco, linhas)
+    tempo_novo = medir(ler_linha, linhas)
+    print(f"  laço de padrões: {tempo_laco * 1e6 / len(linhas):8.2f} µs/linha")
+    print(f"  ler_linha:       {tempo_novo * 1e6 / len(linhas):8.2f} µs/linha ({tempo_laco / tempo_novo:.1f}x)")
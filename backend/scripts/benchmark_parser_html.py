@@ -0,0 +1,59 @@
+"""
+Benchmark dos backends de parse HTML (parser_html)
+Compara html.parser, lxml e selectolax em páginas do Guanabara gravadas
+(arquivos passados na linha de comando ou as últimas do arquivo de snapshots):
+tempo só de parse, tempo da extração completa e produtos encontrados
+
+Uso: python scripts/benchmark_parser_html.py [pagina1.html pagina2.html ...]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contextlib
+import io
+import time
+from scraper import MercadoScraper
+from parser_html import criar_documento, backends_disponiveis
+from config import SCRAPING_CONFIG
+from benchmark_extracao import html_sintetico, replicar, paginas_salvas
+
+
+def cronometrar(funcao, repeticoes=3):
+    melhor = None
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = funcao()
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, resultado
+
+
+def benchmark(nome, html, scraper):
+    print(f"\n{nome} ({len(html) / 1024:.0f} KB)")
+    print(f"  {'backend':<12} {'parse s':>8} {'texto s':>8} {'extração s':>11} {'produtos':>9}")
+    original = SCRAPING_CONFIG.get('parser_html')
+    try:
+        for backend in backends_disponiveis()[::-1]:
+            t_parse, documento = cronometrar(lambda: criar_documento(html, backend))
+            t_texto, _ = cronometrar(documento.texto)
+            SCRAPING_CONFIG['parser_html'] = backend
+            t_extracao, produtos = cronometrar(
+                lambda: scraper.extrair_produtos_de_html(html, 'guanabara', 'Benchmark')
+            )
+            print(f"  {backend:<12} {t_parse:>8.3f} {t_texto:>8.3f} {t_extracao:>11.3f} {len(produtos):>9}")
+    finally:
+        SCRAPING_CONFIG['parser_html'] = original
+
+
+if __name__ == '__main__':
+    paginas = list(paginas_salvas(sys.argv[1:]))
+    scraper = MercadoScraper()
+    print(f"Backends disponíveis: {', '.join(backends_disponiveis())}")
+    if not paginas:
+        print("Nenhum HTML salvo encontrado; usando página sintética")
+        benchmark('sintético (3200 produtos)', replicar(html_sintetico(), 16), scraper)
+    for nome, html in paginas:
+        benchmark(nome, html, scraper)
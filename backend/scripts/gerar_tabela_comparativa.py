@@ -30,13 +30,16 @@ def gerar_tabela_comparativa():
     # Processar imagens com OCR
     print("\nProcessando imagens com OCR...")
     todos_produtos = []
-    for mercado_key, mercado_info in MERCADOS.items():
-        print(f"  Processando {mercado_info['nome']}...")
-        produtos = ocr.processar_imagens_mercado(mercado_info['nome'])
-        for produto in produtos:
-            produto['mercado'] = mercado_info['nome']
-            produto['url_fonte'] = mercado_info['url']
-            todos_produtos.append(produto)
+    try:
+        for mercado_key, mercado_info in MERCADOS.items():
+            print(f"  Processando {mercado_info['nome']}...")
+            produtos = ocr.processar_imagens_mercado(mercado_info['nome'])
+            for produto in produtos:
+                produto['mercado'] = mercado_info['nome']
+                produto['url_fonte'] = mercado_info['url']
+                todos_produtos.append(produto)
+    finally:
+        ocr.fechar()
     
     if not todos_produtos:
         print("Nenhum produto encontrado. Usando dados existentes...")
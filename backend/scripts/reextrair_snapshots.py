@@ -0,0 +1,43 @@
+"""
+Reextração offline sobre o arquivo de snapshots (data/snapshots)
+Roda a extração atual sobre as páginas já baixadas, sem navegador nem rede,
+para validar mudanças nos parsers contra dias de dados reais
+
+Uso: python scripts/reextrair_snapshots.py [--mercado guanabara] [--categoria Açougue] [--dias 7]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import time
+from datetime import datetime, timedelta
+from scraper import MercadoScraper
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reextrai produtos das páginas arquivadas')
+    parser.add_argument('--mercado')
+    parser.add_argument('--categoria')
+    parser.add_argument('--dias', type=int, default=7, help='capturas dos últimos N dias')
+    args = parser.parse_args()
+
+    scraper = MercadoScraper()
+    desde = datetime.now() - timedelta(days=args.dias)
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultados = scraper.reextrair_snapshots(args.mercado, args.categoria, desde=desde)
+    duracao = time.perf_counter() - inicio
+
+    if not resultados:
+        print("Nenhuma captura no período")
+        sys.exit(0)
+    print(f"{'capturado em':<20} {'mercado':<12} {'categoria':<24} {'tipo':<7} {'KB':>7} {'produtos':>9}")
+    for entrada, produtos in resultados:
+        print(f"{entrada['capturado_em']:<20} {entrada.get('mercado') or '-':<12} "
+              f"{(entrada.get('categoria') or '-')[:24]:<24} {entrada['tipo']:<7} "
+              f"{entrada['tamanho'] / 1024:>7.0f} {len(produtos):>9}")
+    unicas = len({e['sha256'] for e, _ in resultados})
+    print(f"\n{len(resultados)} capturas ({unicas} páginas distintas) reextraídas em {duracao:.2f}s")
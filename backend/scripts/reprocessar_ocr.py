@@ -0,0 +1,29 @@
+"""
+Reprocessamento só dos parsers sobre o OCR guardado (cache/encartes/ocr)
+Reaplica OCRProcessor.limpar_dados_mercado ao texto OCR já extraído das
+imagens de cada mercado, sem rodar o Tesseract, para iterar nos parsers em
+segundos. Imagens sem OCR guardado com a configuração atual são puladas
+
+Uso: python scripts/reprocessar_ocr.py [mercado1 mercado2 ...]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contextlib
+import io
+import time
+from ocr_processor import OCRProcessor
+from config import MERCADOS
+
+
+if __name__ == '__main__':
+    chaves = sys.argv[1:] or list(MERCADOS)
+    ocr = OCRProcessor()
+    print(f"{'mercado':<20} {'produtos':>9} {'tempo s':>9}")
+    for chave in chaves:
+        nome = MERCADOS[chave]['nome'] if chave in MERCADOS else chave
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            produtos = ocr.processar_imagens_mercado(nome, somente_cache=True)
+        print(f"{nome:<20} {len(produtos):>9} {time.perf_counter() - inicio:>9.2f}")
@@ -0,0 +1,180 @@
+"""
+Seleção adaptativa do modo de segmentação (PSM) do Tesseract
+Em vez de rodar todos os PSMs em cada imagem e ficar com o texto mais longo,
+roda um de cada vez na ordem aprendida para o mercado e para assim que a
+leitura é boa o bastante (densidade de preços e confiança média das palavras).
+A ordem de cada mercado é aprendida pelo PSM que mais vezes deu a melhor leitura
+entre as comparadas: uma leitura que parou na primeira passada não conta vitória.
+Para a ordem não só reforçar o primeiro PSM, a cada OCR_CONFIG['exploracao_psm']
+imagens do mercado todas as passadas rodam e são comparadas
+"""
+import json
+import os
+import threading
+from config import CACHE_DIR, OCR_CONFIG
+from motor_ocr import motor_ocr
+from mosaico_ocr import precisa_ladrilhos, dados_em_ladrilhos
+from padroes_preco import PRECO_OU_RS
+
+
+def texto_de_dados(dados):
+    """Texto (uma linha por linha do Tesseract) a partir da saída de image_to_data"""
+    linhas = []
+    chave_atual = None
+    for i, palavra in enumerate(dados['text']):
+        palavra = palavra.strip()
+        if not palavra:
+            continue
+        chave = (dados['block_num'][i], dados['par_num'][i], dados['line_num'][i])
+        if chave != chave_atual:
+            linhas.append([])
+            chave_atual = chave
+        linhas[-1].append(palavra)
+    return '\n'.join(' '.join(palavras) for palavras in linhas)
+
+
+def palavras_de_dados(dados):
+    """Caixas das palavras da saída de image_to_data: [texto, x, y, largura, altura, confiança]"""
+    return [
+        [palavra.strip(), dados['left'][i], dados['top'][i], dados['width'][i], dados['height'][i],
+         round(float(dados['conf'][i]), 1)]
+        for i, palavra in enumerate(dados['text']) if palavra.strip()
+    ]
+
+
+def avaliar_leitura(dados, texto):
+    """Pontuação (0 a 1) de uma passada: metade confiança média, metade densidade de preços por linha"""
+    confiancas = [float(c) for c in dados['conf'] if float(c) >= 0]
+    confianca = sum(confiancas) / len(confiancas) / 100 if confiancas else 0.0
+    linhas = [linha for linha in texto.split('\n') if linha.strip()]
+    precos = len(PRECO_OU_RS.findall(texto))
+    densidade = precos / len(linhas) if linhas else 0.0
+    alvo = OCR_CONFIG.get('densidade_precos_alvo', 0.2)
+    return {
+        'pontuacao': 0.5 * confianca + 0.5 * min(1.0, densidade / alvo),
+        'confianca': confianca,
+        'precos': precos
+    }
+
+
+def ocr_psms(imagem, psms, limiar=None, workers_ladrilhos=None):
+    """
+    Roda o Tesseract com cada PSM de `psms`, em ordem, parando na primeira
+    leitura com pontuação >= limiar (limiar None = todas as passadas). Entre as
+    passadas feitas fica a com mais preços (desempate pelo tamanho do texto).
+    Se todas falharem, tenta OCR_CONFIG['psm'], como o modo não adaptativo.
+    Páginas grandes são lidas em ladrilhos (mosaico_ocr, em workers_ladrilhos threads).
+    Retorna (texto, relatorio) com o PSM escolhido, as leituras comparadas, as
+    passadas tentadas, as que falharam e as economizadas (não tentadas), e as
+    caixas das palavras da leitura escolhida
+    """
+    motor = motor_ocr()
+    em_ladrilhos = precisa_ladrilhos(imagem)
+    ler = lambda psm: dados_em_ladrilhos(imagem, psm, workers_ladrilhos) if em_ladrilhos else motor.dados(imagem, psm)
+    leituras = []
+    tentativas = 0
+    for psm in psms:
+        tentativas += 1
+        try:
+            dados = ler(psm)
+        except Exception:
+            continue
+        texto = texto_de_dados(dados)
+        avaliacao = avaliar_leitura(dados, texto)
+        leituras.append((psm, texto, avaliacao, dados))
+        if limiar is not None and avaliacao['pontuacao'] >= limiar:
+            break
+
+    relatorio = {
+        'psm': None,
+        'comparadas': len(leituras),
+        'tentativas': tentativas,
+        'falhas': tentativas - len(leituras),
+        'economizadas': len(psms) - tentativas
+    }
+    if not leituras:
+        # Fallback: configuração padrão (um erro aqui sobe para quem chamou, como no modo não adaptativo)
+        relatorio['tentativas'] += 1
+        dados = ler(OCR_CONFIG['psm'])
+        texto = texto_de_dados(dados)
+        leituras.append((OCR_CONFIG['psm'], texto, avaliar_leitura(dados, texto), dados))
+    psm, texto, avaliacao, dados = max(leituras, key=lambda l: (l[2]['precos'], len(l[1])))
+    relatorio.update(psm=psm, pontuacao=avaliacao['pontuacao'], palavras=palavras_de_dados(dados))
+    return texto, relatorio
+
+
+class SelecaoPSM:
+    def __init__(self, caminho=None):
+        self.caminho = caminho or os.path.join(CACHE_DIR, 'psm_mercados.json')
+        self._lock = threading.Lock()
+        self._dados = self._carregar()
+        self._alterado = False
+        self._vistas = {}  # mercado -> imagens vistas nesta execução (exploração)
+        self.estatisticas = self._estatisticas_vazias()
+
+    @staticmethod
+    def _estatisticas_vazias():
+        return {'imagens': 0, 'tentativas': 0, 'falhas': 0, 'economizadas': 0}
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _gravar(self):
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._dados, f, indent=2)
+        os.replace(temporario, self.caminho)
+
+    def ordem(self, mercado, psms):
+        """PSMs de `psms` com os que mais venceram no mercado primeiro (empate mantém a ordem dada)"""
+        with self._lock:
+            vitorias = self._dados.get(mercado or '', {})
+            return sorted(psms, key=lambda psm: -vitorias.get(str(psm), 0))
+
+    def explorar(self, mercado):
+        """True na primeira e a cada OCR_CONFIG['exploracao_psm'] imagens do mercado: rodar todas as passadas, sem limiar"""
+        intervalo = OCR_CONFIG.get('exploracao_psm', 10)
+        if not intervalo:
+            return False
+        with self._lock:
+            vistas = self._vistas.get(mercado or '', 0)
+            self._vistas[mercado or ''] = vistas + 1
+            return vistas % intervalo == 0
+
+    def registrar(self, mercado, relatorio):
+        """
+        Conta as passadas (tentadas, com falha e economizadas) de uma imagem e,
+        se houve pelo menos duas leituras comparadas, a vitória do PSM escolhido.
+        Não grava: salvar() uma vez por lote
+        """
+        if not relatorio:
+            return
+        with self._lock:
+            self.estatisticas['imagens'] += 1
+            for chave in ('tentativas', 'falhas', 'economizadas'):
+                self.estatisticas[chave] += relatorio[chave]
+            if relatorio.get('psm') is None or relatorio.get('comparadas', 0) < 2:
+                return
+            vitorias = self._dados.setdefault(mercado or '', {})
+            vitorias[str(relatorio['psm'])] = vitorias.get(str(relatorio['psm']), 0) + 1
+            self._alterado = True
+
+    def salvar(self):
+        """Grava as vitórias por mercado, se mudaram desde a última gravação"""
+        with self._lock:
+            if not self._alterado:
+                return
+            try:
+                self._gravar()
+                self._alterado = False
+            except OSError as e:
+                print(f"Erro ao salvar PSMs por mercado: {e}")
+
+    def limpar_estatisticas(self):
+        with self._lock:
+            self.estatisticas = self._estatisticas_vazias()
+            self._vistas = {}
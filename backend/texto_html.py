@@ -0,0 +1,75 @@
+"""
+Texto de uma página HTML sem as tags, com mapa de posições de volta ao HTML
+Equivale a BeautifulSoup(html).get_text(separator=' ', strip=True) (sem
+comentários, scripts, estilos e templates), mas é calculado uma única vez por
+página: trechos em torno de cada preço viram fatias deste texto em vez de um
+novo parse do HTML
+"""
+import bisect
+import html as html_lib
+import re
+
+# Comentários e elementos cujo conteúdo não é texto visível vêm antes da tag genérica
+_PADRAO_TAGS = re.compile(
+    r'<!--.*?(?:-->|$)|<(script|style|template)\b[^>]*>.*?(?:</\1\s*>|$)|<[^>]*>?',
+    re.DOTALL | re.IGNORECASE
+)
+
+
+class TextoMapeado:
+    def __init__(self, html):
+        self.tamanho_html = len(html)
+        partes = []
+        # Por trecho de texto: posição no texto e posição correspondente no HTML
+        self._inicios_texto = []
+        self._inicios_html = []
+        tamanho = 0
+        anterior = 0
+
+        def adicionar(inicio, fim):
+            nonlocal tamanho
+            bruto = html[inicio:fim]
+            trecho = html_lib.unescape(bruto).strip()
+            if not trecho:
+                return
+            if partes:
+                partes.append(' ')
+                tamanho += 1
+            self._inicios_texto.append(tamanho)
+            self._inicios_html.append(inicio + len(bruto) - len(bruto.lstrip()))
+            partes.append(trecho)
+            tamanho += len(trecho)
+
+        for tag in _PADRAO_TAGS.finditer(html):
+            if tag.start() > anterior:
+                adicionar(anterior, tag.start())
+            anterior = tag.end()
+        if anterior < len(html):
+            adicionar(anterior, len(html))
+
+        self.texto = ''.join(partes)
+
+    @classmethod
+    def de_texto(cls, texto):
+        """Mapa identidade para uma página da qual só se tem o texto (as janelas passam a ser medidas no texto)"""
+        mapeado = cls('')
+        mapeado.texto = texto
+        mapeado.tamanho_html = len(texto)
+        mapeado._inicios_texto = [0]
+        mapeado._inicios_html = [0]
+        return mapeado
+
+    def posicao_html(self, pos_texto):
+        """Posição aproximada no HTML de um caractere do texto (exata sem entidades)"""
+        i = bisect.bisect_right(self._inicios_texto, pos_texto) - 1
+        if i < 0:
+            return 0
+        return min(self.tamanho_html, self._inicios_html[i] + pos_texto - self._inicios_texto[i])
+
+    def posicao_texto(self, pos_html):
+        """Posição no texto do primeiro caractere visível a partir de `pos_html`"""
+        i = bisect.bisect_right(self._inicios_html, pos_html) - 1
+        if i < 0:
+            return 0
+        fim_trecho = self._inicios_texto[i + 1] - 1 if i + 1 < len(self._inicios_texto) else len(self.texto)
+        return min(fim_trecho, self._inicios_texto[i] + pos_html - self._inicios_html[i])
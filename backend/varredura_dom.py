@@ -0,0 +1,57 @@
+"""
+Varredura da árvore HTML em uma única passada, de baixo para cima
+O texto de cada elemento é montado a partir do texto já calculado dos filhos
+(em vez de get_text() em cada nível, que re-concatena a subárvore inteira) e
+só é materializado para elementos pequenos o bastante para serem um card de
+produto. Um elemento que já contém um produto em um descendente é ignorado:
+fica sempre o menor elemento com nome + preço
+"""
+
+# Tags que podem ser o card de um produto
+TAGS_PRODUTO = frozenset(['div', 'li', 'article', 'span', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'a', 'td', 'tr', 'section'])
+# Classes de elementos de produto (busca por classe, quando a varredura rende pouco)
+CLASSES_PRODUTO = ['produto', 'product', 'item', 'card', 'oferta', 'product-card']
+
+
+def varrer_elementos(documento, avaliar, tags=TAGS_PRODUTO, max_texto=500):
+    """
+    Percorre um DocumentoHTML (parser_html) e chama avaliar(elemento, texto)
+    para cada elemento de `tags` cujo texto (equivalente a get_text(strip=True))
+    tem até `max_texto` caracteres e cujos descendentes ainda não renderam
+    produto. avaliar retorna True quando o elemento é um produto. Retorna o
+    número de elementos avaliados.
+    """
+    if documento.raiz is None:
+        return 0
+    avaliados = 0
+    # Um quadro por elemento aberto: [elemento, filhos pendentes, partes do texto, tamanho, contém produto]
+    pilha = [[documento.raiz, iter(documento.filhos(documento.raiz)), [], 0, False]]
+
+    while pilha:
+        quadro = pilha[-1]
+        filho = next(quadro[1], None)
+
+        if filho is None:
+            # Todos os filhos processados: fechar o elemento e repassar ao pai
+            pilha.pop()
+            elem, _, partes, tamanho, contem_produto = quadro
+            texto = ''.join(partes) if tamanho <= max_texto else None
+            if texto and not contem_produto and documento.nome(elem) in tags:
+                avaliados += 1
+                contem_produto = bool(avaliar(elem, texto))
+            if pilha:
+                pai = pilha[-1]
+                pai[3] += tamanho
+                if pai[3] <= max_texto:
+                    pai[2].append(texto)
+                pai[4] = pai[4] or contem_produto
+        elif isinstance(filho, str):
+            texto_filho = filho.strip()
+            if texto_filho:
+                quadro[3] += len(texto_filho)
+                if quadro[3] <= max_texto:
+                    quadro[2].append(texto_filho)
+        else:
+            pilha.append([filho, iter(documento.filhos(filho)), [], 0, False])
+
+    return avaliados